@@ -10,12 +10,12 @@ if errorlevel 1 exit /b %errorlevel%
 xcopy /E /I /Y "src" "output\src\" > nul
 if errorlevel 1 exit /b %errorlevel%
 
-if exist output\SFML rmdir /s /q output\SFML
+if not defined PYSF_INCREMENTAL if exist output\SFML rmdir /s /q output\SFML
 robocopy "SFML" "output\SFML" /E /XD .git > nul
 if %errorlevel% GEQ 8 exit /b %errorlevel%
 
-if exist output\build rmdir /s /q output\build
-mkdir output\build
+if not defined PYSF_INCREMENTAL if exist output\build rmdir /s /q output\build
+if not exist output\build mkdir output\build
 
 cd output\build
 cmake -G "Visual Studio 17 2022" -A x64 ..
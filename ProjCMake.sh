@@ -8,19 +8,19 @@ if ! [ -d output ]; then
 fi
 
 mkdir -p output/include output/src
-cp -R include/. output/include/
-cp -R src/. output/src/
+cp -Rp include/. output/include/
+cp -Rp src/. output/src/
 
-if [ -d output/SFML ]; then
+if [ -d output/SFML ] && [ -z "$PYSF_INCREMENTAL" ]; then
     rm -rf output/SFML
 fi
 mkdir -p output/SFML
 rsync -a --exclude .git SFML/ output/SFML/
 
-if [ -d output/build ]; then
+if [ -d output/build ] && [ -z "$PYSF_INCREMENTAL" ]; then
     rm -rf output/build
 fi
-mkdir output/build
+mkdir -p output/build
 cd output/build
 
 cmake -DCMAKE_POLICY_VERSION_MINIMUM=3.5 -DCMAKE_BUILD_TYPE=Release ..
@@ -70,19 +70,19 @@ if ! [ -d output ]; then
 fi
 
 mkdir -p output/include output/src
-cp -R include/. output/include/
-cp -R src/. output/src/
+cp -Rp include/. output/include/
+cp -Rp src/. output/src/
 
-if [ -d output/SFML ]; then
+if [ -d output/SFML ] && [ -z "$PYSF_INCREMENTAL" ]; then
     rm -rf output/SFML
 fi
 mkdir -p output/SFML
 rsync -a --exclude .git SFML/ output/SFML/
 
-if [ -d output/build_ios ]; then
+if [ -d output/build_ios ] && [ -z "$PYSF_INCREMENTAL" ]; then
     rm -rf output/build_ios
 fi
-mkdir output/build_ios
+mkdir -p output/build_ios
 cd output/build_ios
 
 cmake -G Xcode \
@@ -1,4 +1,6 @@
+import io
 import os
+import re
 import sys
 import glob
 import traceback
@@ -8,9 +10,12 @@ import clang.cindex
 from .hppParser import Parser
 from .bindingGenerator import Generator
 from .hppSorter import Sorter
-from .utils import scan_hpp_files
+from .parseCache import ParseCache
+from .tuProvider import TranslationUnitProvider, get_clang_args
+from .workers import ShardedExecutor, init_worker, generate_binding_job, replay_logs
+from .utils import scan_hpp_files, write_if_changed, remove_stale_files
 
-__all__ = ["Parser", "Generator"]
+__all__ = ["Parser", "Generator", "ParseCache", "TranslationUnitProvider"]
 __version__ = "1.2.1"
 __author__ = "JasonLeon"
 __copyright__ = "Copyright (c) 2026, JasonLeon"
@@ -70,9 +75,7 @@ def generate_binding_from_hpp(
     hpp_root,
     hpp_file,
     output_file,
-    includes,
-    cpp_version,
-    ignored_macros,
+    tu_provider,
     REPLACE_TYPE,
     SPECIFIC_TYPE,
     IGNORE_TYPE,
@@ -82,9 +85,20 @@ def generate_binding_from_hpp(
     IGNORED_MODULE,
     SPECIAL_REPLACE,
     READWRITE_IGNORE,
+    BUFFER_PROTOCOL,
+    GIL_RELEASE,
+    LIFETIME_POLICY,
+    BUFFER_LENGTH,
+    parse_cache=None,
 ):
-    parser = Parser(includes, hpp_root, hpp_file, cpp_version, ignored_macros)
-    items = parser.get_dict()
+    items = None
+    if parse_cache is not None:
+        items = parse_cache.load(hpp_file, tu_provider.clang_args)
+    if items is None:
+        parser = Parser(hpp_root, hpp_file, tu_provider)
+        items = parser.get_dict()
+        if parse_cache is not None:
+            parse_cache.store(hpp_file, tu_provider.clang_args, parser.get_dependencies(), items)
     generator = Generator(
         common_module_name,
         items,
@@ -97,29 +111,50 @@ def generate_binding_from_hpp(
         IGNORED_MODULE,
         SPECIAL_REPLACE,
         READWRITE_IGNORE,
+        BUFFER_PROTOCOL,
+        GIL_RELEASE,
+        LIFETIME_POLICY,
+        BUFFER_LENGTH,
         hpp_file,
     )
     generator.emit_pybind_module(output_file)
 
 
+def get_addition_type_names(hpp_file):
+    addition_file = f"Additions/bind_{Path(hpp_file).stem}_Addition.txt"
+    if not os.path.exists(addition_file):
+        return set()
+
+    with open(addition_file, "r", encoding="utf-8") as f:
+        return set(re.findall(r"\bsf(?:::[A-Za-z_]\w*)+", f.read()))
+
+
 def generate_hpp_file_from_hpp(
     read_file,
     hpp_file,
     output_file,
+    extra_includes=(),
 ):
-    with open(output_file, "w", encoding="utf-8") as f:
-        file_names = Path(read_file).parts[-3:]
-        real_include = "/".join(file_names)
-        f.write(f'#include "{real_include}"\n')
-        f.write(f'#include "utils.hpp"\n')
-        f.write("namespace py = pybind11;\n\n")
-        f.write(f"void bind_{hpp_file.split('.')[0]}(py::module &m); \n")
-    print(f"Generated {output_file}")
+    file_names = Path(read_file).parts[-3:]
+    real_include = "/".join(file_names)
+    content = [f'#include "{real_include}"\n']
+    for include in extra_includes:
+        if include != real_include:
+            content.append(f'#include "{include}"\n')
+    content += [
+        f'#include "utils.hpp"\n',
+        "namespace py = pybind11;\n\n",
+        f"void bind_{hpp_file.split('.')[0]}(py::module &m); \n",
+    ]
+    if write_if_changed(output_file, "".join(content)):
+        print(f"Generated {output_file}")
+    else:
+        print(f"Unchanged {output_file}")
 
 
 def generate_pybind_main(source_files, output_filename):
     try:
-        with open(output_filename, "w", encoding="utf-8") as f:
+        with io.StringIO() as f:
             f.write(
                 "// This file is automatically generated by the Python script and should not be modified manually.\n\n"
             )
@@ -144,47 +179,105 @@ def generate_pybind_main(source_files, output_filename):
                 f.write(f"    {base_name}(m);\n")
 
             f.write("}\n")
+            content = f.getvalue()
 
-        print(f"Generated {output_filename}")
+        if write_if_changed(output_filename, content):
+            print(f"Generated {output_filename}")
+        else:
+            print(f"Unchanged {output_filename}")
     except IOError as e:
         print(f"Error writing to {output_filename}: {e} {traceback.format_exc()}")
     except Exception as e:
         print(f"An unexpected error occurred when generating {output_filename}: {e} {traceback.format_exc()}")
 
 
-def generate_cmakelists(source_files, self_files, python_version, output_filename="output/CMakeLists.txt"):
+def _is_self_file(filename, self_files):
+    for self_file in self_files:
+        if filename in self_file:
+            return True
+    return False
+
+
+def generate_unity_sources(source_files, self_files, unity_count, output_folder="output"):
+    src_folder = os.path.join(output_folder, "src")
+    unity_folder = os.path.join(src_folder, "unity")
+    bind_sources = []
+    for filename in source_files:
+        if _is_self_file(filename, self_files):
+            continue
+        source = f'{filename.split(".")[0]}.cpp'
+        source_path = os.path.join(src_folder, source)
+        size = os.path.getsize(source_path) if os.path.exists(source_path) else 0
+        bind_sources.append((size, source))
+
+    groups = [[0, []] for _ in range(max(1, min(unity_count, len(bind_sources))))]
+    for size, source in sorted(bind_sources, key=lambda item: (-item[0], item[1])):
+        group = min(groups, key=lambda g: g[0])
+        group[0] += size
+        group[1].append(source)
+
+    os.makedirs(unity_folder, exist_ok=True)
+    unity_sources = []
+    for i, (total_size, sources) in enumerate(groups):
+        unity_name = f"unity/pysf_unity_{i}.cpp"
+        content = [
+            "// This file is automatically generated by the Python script and should not be modified manually.\n\n"
+        ]
+        for source in sorted(sources):
+            content.append(f'#include "../{source}"\n')
+        unity_path = os.path.join(src_folder, unity_name)
+        if write_if_changed(unity_path, "".join(content)):
+            print(f"Generated {unity_path} ({len(sources)} files, {total_size} bytes)")
+        else:
+            print(f"Unchanged {unity_path}")
+        unity_sources.append(unity_name)
+
+    expected_files = [os.path.join(src_folder, unity_name) for unity_name in unity_sources]
+    for stale_file in remove_stale_files(unity_folder, r"pysf_unity_\d+\.cpp", expected_files):
+        print(f"Removed stale {stale_file}")
+    return unity_sources
+
+
+def generate_cmakelists(
+    source_files,
+    self_files,
+    python_version,
+    output_filename="output/CMakeLists.txt",
+    use_pch=True,
+    unity_sources=None,
+):
     template_filename = "CMakeLists.txt.in"
 
     try:
         sources_arr = []
         mm_sources_arr = []
         for filename in source_files:
-            flag = False
-            for self_file in self_files:
-                if filename in self_file:
-                    flag = True
-                    break
-            if flag:
+            if _is_self_file(filename, self_files):
                 sources_arr.append(f'    "src/{filename.split(".")[0]}.cpp"')
                 if os.path.exists(f'src/{filename.split(".")[0]}.mm'):
                     mm_sources_arr.append(f'        "src/{filename.split(".")[0]}.mm"')
-            else:
+            elif not unity_sources:
                 sources_arr.append(f'    "src/{filename.split(".")[0]}.cpp"')
+        for unity_source in unity_sources or []:
+            sources_arr.append(f'    "src/{unity_source}"')
         sources = "\n".join(sources_arr)
         mm_sources = "\n".join(mm_sources_arr)
 
         output_dir = os.path.dirname(output_filename)
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
-        with open(template_filename, encoding="utf-8") as template, open(
-            output_filename, "w", encoding="utf-8"
-        ) as out:
+        with open(template_filename, encoding="utf-8") as template:
             cmake_content = template.read().format(
-                sources=sources, mm_sources=mm_sources, python_version=python_version
+                sources=sources,
+                mm_sources=mm_sources,
+                python_version=python_version,
+                use_pch="ON" if use_pch else "OFF",
             )
-            out.write(cmake_content)
 
-        print(f"CMakeLists.txt generated successfully: {output_filename}")
+        if write_if_changed(output_filename, cmake_content):
+            print(f"CMakeLists.txt generated successfully: {output_filename}")
+        else:
+            print(f"CMakeLists.txt unchanged: {output_filename}")
 
     except IOError as e:
         print(f"Error writing to {output_filename}: {e} {traceback.format_exc()}")
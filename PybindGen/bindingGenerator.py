@@ -2,7 +2,7 @@ import os
 import re
 from pathlib import Path
 import tempfile
-from .utils import normalize_type
+from .utils import normalize_type, write_if_changed
 
 UNARY_OPERATOR_MAP = {
     "operator-": "__neg__",
@@ -49,6 +49,12 @@ IGNORE_LIST = [
     'operator""_deg',
     'operator""_rad',
 ]
+WRAP_FUNCTION_INCLUDES = {
+    r"\bfloat\s*\*.*\bfloat\s*\*": "wrap_audio_utils.hpp",
+    r"\bPlaybackDevice::Notification\b": "wrap_audio_utils.hpp",
+    r"\bText::ShapedGlyph\b": "wrap_graphics_utils.hpp",
+    r"\bSocketSelector::ReadinessType\b": "wrap_network_utils.hpp",
+}
 
 
 class Generator:
@@ -65,6 +71,10 @@ class Generator:
         IGNORED_MODULE,
         SPECIAL_REPLACE,
         READWRITE_IGNORE,
+        BUFFER_PROTOCOL,
+        GIL_RELEASE,
+        LIFETIME_POLICY,
+        BUFFER_LENGTH,
         hpp_file,
     ):
         self._common_module_name = common_module_name
@@ -78,6 +88,10 @@ class Generator:
         self._IGNORED_MODULE = IGNORED_MODULE
         self._SPECIAL_REPLACE = SPECIAL_REPLACE
         self._READWRITE_IGNORE = READWRITE_IGNORE
+        self._BUFFER_PROTOCOL = BUFFER_PROTOCOL
+        self._GIL_RELEASE = GIL_RELEASE
+        self._LIFETIME_POLICY = LIFETIME_POLICY
+        self._BUFFER_LENGTH = BUFFER_LENGTH
         self._hpp_file = hpp_file
         self._short_type_to_qualified = self._build_short_type_map(self._dict_root)
         self._namespaces = self._build_namespace_set(self._dict_root)
@@ -322,19 +336,27 @@ class Generator:
             temp_other_lines.append(to_append)
         other_lines = temp_other_lines
 
-        with open(out_file, "w", encoding="utf-8") as f:
-            f.write(f'#include "{bind_name}"\n')
-            f.write("namespace py = pybind11;\n\n")
-            f.write(f"void bind_{file_name.split('.')[0]}(py::module &m) {{\n")
-
-            for line in auto_lines:
-                f.write(line)
-            for line in other_lines:
-                f.write(line)
-
-            f.write("}\n")
+        wrap_includes = set()
+        for line in auto_lines + other_lines:
+            for signature in re.findall(r"wrap_pyfunction<(.*?)>\(", line):
+                for pattern, include in WRAP_FUNCTION_INCLUDES.items():
+                    if re.search(pattern, signature):
+                        wrap_includes.add(include)
+
+        content = [f'#include "{bind_name}"\n']
+        content.extend(f'#include "{include}"\n' for include in sorted(wrap_includes))
+        content += [
+            "namespace py = pybind11;\n\n",
+            f"void bind_{file_name.split('.')[0]}(py::module &m) {{\n",
+        ]
+        content.extend(auto_lines)
+        content.extend(other_lines)
+        content.append("}\n")
         os.remove(tmp_f.name)
-        print(f"Generated {out_file}")
+        if write_if_changed(out_file, "".join(content)):
+            print(f"Generated {out_file}")
+        else:
+            print(f"Unchanged {out_file}")
 
     def _should_ignore_function(self, func):
         if not self._IGNORE_PARAM_TYPE:
@@ -398,6 +420,13 @@ class Generator:
                 return value
         return None
 
+    def _format_call_expr(self, call_expr_template, data, cpp_type):
+        call_expr = call_expr_template.replace("DATA", data)
+        if "WRITABLE" in call_expr:
+            is_const_pointee = re.search(r"\bconst\b[^*]*\*", cpp_type) is not None
+            call_expr = call_expr.replace("WRITABLE", "false" if is_const_pointee else "true")
+        return call_expr
+
     def _get_function_replacement(self, cpp_type, raw_type=None):
         type_ = cpp_type
         if "std::function" in type_:
@@ -731,7 +760,7 @@ class Generator:
 
         return enum_value
 
-    def _get_forward_call_arguments(self, parameters):
+    def _get_forward_call_arguments(self, parameters, hoisted_args=None):
         callargs = []
         for p in parameters:
             specific_replacement = self._get_specific_type_replacement(p["type"], p.get("raw_type", None))
@@ -739,7 +768,10 @@ class Generator:
                 specific_replacement = self._get_function_replacement(p["type"], p.get("raw_type", None))
             if specific_replacement:
                 _, call_expr_template = specific_replacement
-                call_expr = call_expr_template.replace("DATA", p["name"])
+                call_expr = self._format_call_expr(call_expr_template, p["name"], p["type"])
+                if hoisted_args is not None:
+                    hoisted_args.append(f"auto&& {p['name']}_arg = {call_expr};")
+                    call_expr = f"{p['name']}_arg"
                 callargs.append(call_expr)
                 continue
 
@@ -751,13 +783,40 @@ class Generator:
                 callargs.append(p["name"])
         return ", ".join(callargs)
 
-    def _function_forward_call(self, selfname, funcname, parameters, is_static):
-        params_string = self._get_forward_call_arguments(parameters)
+    def _function_forward_call(self, selfname, funcname, parameters, is_static, hoisted_args=None):
+        params_string = self._get_forward_call_arguments(parameters, hoisted_args)
         if is_static:
             return f"{selfname}::{funcname}({params_string})"
         else:
             return f"self.{funcname}({params_string})"
 
+    def _should_release_gil(self, scope, name):
+        return name in self._GIL_RELEASE.get(scope, [])
+
+    def _lifetime_policy_string(self, scope, name):
+        policy = self._LIFETIME_POLICY.get(scope, {}).get(name)
+        return f", {policy}" if policy else ""
+
+    def _buffer_length_checks(self, scope, name, parameters):
+        param_names = {p["name"] for p in parameters} | {"self"}
+        views = {
+            p["name"] for p in parameters if self._get_specific_type_replacement(p["type"], p.get("raw_type", None))
+        }
+        checks = {}
+        for pointer, count in self._BUFFER_LENGTH.get(scope, {}).get(name, []):
+            if pointer not in views or pointer in checks:
+                continue
+            # An entry only applies to the overloads having every variable of its count expression.
+            if set(re.findall(r"(?<![\w.:])[A-Za-z_]\w*(?!\w|\s*::)", count)) <= param_names:
+                checks[pointer] = f'require_buffer_length({pointer}_arg.size(), {count}, "{pointer}");'
+        return list(checks.values())
+
+    def _hoisted_body(self, hoisted_args, length_checks, release_gil, lambda_body):
+        if hoisted_args is None:
+            return lambda_body
+        release = ["py::gil_scoped_release release;"] if release_gil else []
+        return " ".join([*hoisted_args, *length_checks, *release, lambda_body])
+
     def _cpp_operator_lambda_code(self, op, params):
         if len(params) == 1:
             return f"return {op}self;"
@@ -771,7 +830,7 @@ class Generator:
                 specific_replacement = self._get_function_replacement(arg2_type)
             if specific_replacement:
                 _, call_expr_template = specific_replacement
-                arg2 = call_expr_template.replace("DATA", arg2_name)
+                arg2 = self._format_call_expr(call_expr_template, arg2_name, arg2_type)
             else:
                 arg2 = arg2_name
 
@@ -864,6 +923,10 @@ class Generator:
             holder_str = f", std::unique_ptr<{full_class_name}, py::nodelete>"
             print(f"Info: Detected abstract class {full_class_name}, using py::nodelete holder.")
 
+        class_options = ""
+        if full_class_name in self._BUFFER_PROTOCOL:
+            class_options = ", py::buffer_protocol()"
+
         base_classes = []
         for base_info in cls.get("base_classes", []):
             if base_info.get("access") == "public":
@@ -877,11 +940,11 @@ class Generator:
         if base_classes:
             bases_str = ", ".join(f"{base}" for base in base_classes)
             f.write(
-                f'{indent}auto {class_var} = py::class_<{full_class_name}, {bases_str}{holder_str}>({module_var}, "{class_name}"{self._get_docstring_parse(cls)});\n'
+                f'{indent}auto {class_var} = py::class_<{full_class_name}, {bases_str}{holder_str}>({module_var}, "{class_name}"{self._get_docstring_parse(cls)}{class_options});\n'
             )
         else:
             f.write(
-                f'{indent}auto {class_var} = py::class_<{full_class_name}{holder_str}>({module_var}, "{class_name}"{self._get_docstring_parse(cls)});\n'
+                f'{indent}auto {class_var} = py::class_<{full_class_name}{holder_str}>({module_var}, "{class_name}"{self._get_docstring_parse(cls)}{class_options});\n'
             )
 
         if not is_abstract:
@@ -952,22 +1015,31 @@ class Generator:
                                 break
 
                         def_args = self._lambda_argument_string(sub_params)
-                        call_args = self._get_forward_call_arguments(sub_params)
+                        length_checks = self._buffer_length_checks(full_class_name, "__init__", sub_params)
+                        hoisted_args = [] if length_checks else None
+                        call_args = self._get_forward_call_arguments(sub_params, hoisted_args)
                         py_args_str = self._generate_py_args_string(sub_params, include_defaults=include_defaults)
+                        lifetime_policy = self._lifetime_policy_string(full_class_name, "__init__")
 
                         if need_unique:
+                            lambda_body = self._hoisted_body(
+                                hoisted_args, length_checks, False, f"return std::make_unique<{full_class_name}>({call_args});"
+                            )
                             f.write(
-                                f"{indent}{class_var}.def(py::init([]({def_args}) {{ return std::make_unique<{full_class_name}>({call_args}); }}){self._get_docstring_parse(c)}{py_args_str});\n"
+                                f"{indent}{class_var}.def(py::init([]({def_args}) {{ {lambda_body} }}){self._get_docstring_parse(c)}{py_args_str}{lifetime_policy});\n"
                             )
                         else:
                             if need_switch:
+                                lambda_body = self._hoisted_body(
+                                    hoisted_args, length_checks, False, f"return new {full_class_name}({call_args});"
+                                )
                                 f.write(
-                                    f"{indent}{class_var}.def(py::init([]({def_args}) {{ return new {full_class_name}({call_args}); }}){self._get_docstring_parse(c)}{py_args_str});\n"
+                                    f"{indent}{class_var}.def(py::init([]({def_args}) {{ {lambda_body} }}){self._get_docstring_parse(c)}{py_args_str}{lifetime_policy});\n"
                                 )
                             else:
                                 def_args = self._lambda_argument_string_for_default_constructor(sub_params)
                                 f.write(
-                                    f"{indent}{class_var}.def(py::init<{def_args}>(){self._get_docstring_parse(c)}{py_args_str});\n"
+                                    f"{indent}{class_var}.def(py::init<{def_args}>(){self._get_docstring_parse(c)}{py_args_str}{lifetime_policy});\n"
                                 )
 
             if has_public_copy_ctor:
@@ -1101,16 +1173,22 @@ class Generator:
                     pyname = name
                     param_sets = self._default_overload_parameter_sets(params)
                     force_overloads = len(param_sets) > 1
+                    release_gil = self._should_release_gil(full_class_name, name)
+                    lifetime_policy = self._lifetime_policy_string(full_class_name, name)
                     for sub_params in param_sets:
                         include_defaults = not force_overloads
                         def_args = self._lambda_argument_string(sub_params)
                         py_args_str = self._generate_py_args_string(sub_params, include_defaults=include_defaults)
+                        length_checks = self._buffer_length_checks(full_class_name, name, sub_params)
+                        hoisted_args = [] if release_gil or length_checks else None
                         callcode = self._function_forward_call(
-                            full_class_name, name, sub_params, is_static=c.get("static", False)
+                            full_class_name, name, sub_params, is_static=c.get("static", False), hoisted_args=hoisted_args
                         )
                         if c.get("static", False):
+                            lambda_body = f"return {callcode};"
+                            lambda_body = self._hoisted_body(hoisted_args, length_checks, release_gil, lambda_body)
                             f.write(
-                                f'{indent}{class_var}.def_static("{pyname}", []({def_args}) {{ return {callcode}; }}{self._get_docstring_parse(c)}{py_args_str});\n'
+                                f'{indent}{class_var}.def_static("{pyname}", []({def_args}) {{ {lambda_body} }}{self._get_docstring_parse(c)}{py_args_str}{lifetime_policy});\n'
                             )
                         else:
                             all_args = (
@@ -1119,8 +1197,10 @@ class Generator:
                             return_sample = self._check_specific_return_type(return_type)
                             if return_sample:
                                 callcode = return_sample[0].replace("DATA", callcode)
+                            lambda_body = f"return {callcode};"
+                            lambda_body = self._hoisted_body(hoisted_args, length_checks, release_gil, lambda_body)
                             f.write(
-                                f'{indent}{class_var}.def("{pyname}", []({all_args}) {{ return {callcode}; }}{self._get_docstring_parse(c)}{py_args_str});\n'
+                                f'{indent}{class_var}.def("{pyname}", []({all_args}) {{ {lambda_body} }}{self._get_docstring_parse(c)}{py_args_str}{lifetime_policy});\n'
                             )
 
         for c in cls.get("children", []):
@@ -1170,7 +1250,7 @@ class Generator:
                     specific_replacement = self._get_function_replacement(arg2_type)
                 if specific_replacement:
                     _, call_expr_template = specific_replacement
-                    arg2 = call_expr_template.replace("DATA", arg2_name)
+                    arg2 = self._format_call_expr(call_expr_template, arg2_name, arg2_type)
                 else:
                     arg2 = arg2_name
 
@@ -1216,13 +1296,17 @@ class Generator:
 
         return_type = func.get("return_type", "void")
         full_func_name = f"{namespace_prefix}{func['name']}"
+        release_gil = self._should_release_gil(namespace_prefix.rstrip(":"), name)
+        lifetime_policy = self._lifetime_policy_string(namespace_prefix.rstrip(":"), name)
 
         for sub_params in param_sets:
             include_defaults = not force_overloads
             def_args = self._lambda_argument_string(sub_params)
             py_args_str = self._generate_py_args_string(sub_params, include_defaults=include_defaults)
 
-            call_args = self._get_forward_call_arguments(sub_params)
+            length_checks = self._buffer_length_checks(namespace_prefix.rstrip(":"), name, sub_params)
+            hoisted_args = [] if release_gil or length_checks else None
+            call_args = self._get_forward_call_arguments(sub_params, hoisted_args)
             lambda_body = f"{full_func_name}({call_args})"
 
             return_sample = self._check_specific_return_type(return_type)
@@ -1232,9 +1316,10 @@ class Generator:
             if return_type != "void":
                 lambda_body = f"return {lambda_body}"
             lambda_body = f"{lambda_body};"
+            lambda_body = self._hoisted_body(hoisted_args, length_checks, release_gil, lambda_body)
 
             f.write(
-                f'{indent}{module_var}.def("{func["name"]}", []({def_args}) {{ {lambda_body} }}{self._get_docstring_parse(func)}{py_args_str}); // Outer class function \n'
+                f'{indent}{module_var}.def("{func["name"]}", []({def_args}) {{ {lambda_body} }}{self._get_docstring_parse(func)}{py_args_str}{lifetime_policy}); // Outer class function \n'
             )
         self._pop_cpp_scope()
 
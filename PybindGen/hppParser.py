@@ -1,8 +1,7 @@
 import os
 import re
-import sys
 import clang.cindex
-from .utils import get_macos_clang_args
+from .tuProvider import get_dependencies
 
 
 INTERESTED_KINDS = (
@@ -32,27 +31,15 @@ LITERAL_KINDS = (
 
 
 class Parser:
-    def __init__(self, includes, hpp_root, hpp_file, cpp_version, ignored_macros):
-        args = [
-            f"-std={cpp_version}",
-            "-I.",
-            includes,
-            *[f"-D{macro}=" for macro in ignored_macros],
-        ]
-        if sys.platform == "darwin":
-            args.extend(get_macos_clang_args())
-        index = clang.cindex.Index.create()
+    def __init__(self, hpp_root, hpp_file, tu_provider):
         real_path = os.path.join(hpp_root, hpp_file)
-        tu = index.parse(
-            real_path,
-            args,
-            options=clang.cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
-        )
+        tu = tu_provider.get(real_path)
         if tu.diagnostics:
             print("Clang diagnostics:")
             for diag in tu.diagnostics:
                 print(f"  - {diag}")
         target_file = os.path.abspath(real_path)
+        self._dependencies = get_dependencies(tu)
         self._include_root = os.path.abspath(hpp_root)
         self._surface_type_qualifications = {}
         self._ambiguous_surface_type_names = set()
@@ -69,6 +56,9 @@ class Parser:
     def get_dict(self):
         return self._root_items
 
+    def get_dependencies(self):
+        return self._dependencies
+
     def _get_qualified_name(self, cursor):
         if cursor is None:
             return ""
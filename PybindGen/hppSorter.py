@@ -1,22 +1,18 @@
 import os
 import sys
+import json
+import hashlib
 from collections import deque, defaultdict
 from clang import cindex
-from .utils import get_macos_clang_args
+from .tuProvider import get_dependencies
 
 
 class Sorter:
-    def __init__(self, header_paths, include_dirs, cpp_version):
+    def __init__(self, header_paths, tu_provider, parse_cache=None):
         self.header_files = {os.path.abspath(p) for p in header_paths}
-        self.clang_args = []
-        for d in include_dirs:
-            self.clang_args.append(f"-I{os.path.abspath(d)}")
-        self.clang_args.append(f"-std={cpp_version}")
-        self.clang_args.append("-x")
-        self.clang_args.append("c++-header")
-        self.clang_args.append("-fno-delayed-template-parsing")
-        if sys.platform == "darwin":
-            self.clang_args.extend(get_macos_clang_args())
+        self.tu_provider = tu_provider
+        self.clang_args = tu_provider.clang_args
+        self.parse_cache = parse_cache
 
         print("Clang arguments for parsing:")
         for arg in self.clang_args:
@@ -33,6 +29,9 @@ class Sorter:
 
         self.self_references = defaultdict(int)
 
+        self.include_dirs = [os.path.abspath(arg[2:]) for arg in self.clang_args if arg.startswith("-I")]
+        self.referenced_headers = defaultdict(set)
+
     def _is_in_project_headers(self, path):
         if not path:
             return False
@@ -390,55 +389,213 @@ class Sorter:
         except Exception as e:
             print(f"    Warning: Error analyzing dependencies: {e}")
 
-    def build_graph(self):
-        index = cindex.Index.create()
-        print("Building dependency graph...")
+    def _get_include_spelling(self, path):
+        if not path or not path.endswith(".hpp"):
+            return None
 
-        print("\nPhase 1: Collecting type definitions...")
-        tus = {}
-        for header_file in self.header_files:
-            print(f"  Analyzing {os.path.basename(header_file)}...")
-            try:
-                tus[header_file] = index.parse(
-                    header_file,
-                    args=self.clang_args,
-                    options=cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
-                )
-                if not tus[header_file]:
-                    print(f"Warning: Failed to parse {header_file}", file=sys.stderr)
+        path = os.path.abspath(path)
+        for include_dir in self.include_dirs:
+            if path.startswith(include_dir + os.sep):
+                return os.path.relpath(path, include_dir).replace(os.sep, "/")
+        return None
+
+    def _collect_referenced_headers(self, translation_unit):
+        try:
+            current_file_path = os.path.abspath(translation_unit.spelling)
+            referenced_headers = self.referenced_headers[current_file_path]
+
+            for cursor in translation_unit.cursor.walk_preorder():
+                try:
+                    if not cursor.location.file:
+                        continue
+                    if os.path.abspath(cursor.location.file.name) != current_file_path:
+                        continue
+                    if cursor.kind not in (
+                        cindex.CursorKind.TYPE_REF,
+                        cindex.CursorKind.TEMPLATE_REF,
+                        cindex.CursorKind.DECL_REF_EXPR,
+                        cindex.CursorKind.MEMBER_REF_EXPR,
+                    ):
+                        continue
+
+                    referenced = cursor.referenced
+                    if not referenced:
+                        continue
+
+                    declaration = referenced.get_definition() or referenced
+                    dependency_file = None
+                    if declaration.location and declaration.location.file:
+                        dependency_file = os.path.abspath(declaration.location.file.name)
+                    if declaration == referenced and cursor.kind == cindex.CursorKind.TYPE_REF:
+                        dependency_file = (
+                            self._find_type_definition_file(self._get_qualified_name(referenced), current_file_path)
+                            or dependency_file
+                        )
+
+                    if dependency_file and dependency_file != current_file_path:
+                        if self._get_include_spelling(dependency_file):
+                            referenced_headers.add(dependency_file)
+
+                except Exception:
                     continue
 
-                self._collect_type_definitions(tus[header_file])
+        except Exception as e:
+            print(f"    Warning: Error collecting referenced headers: {e}")
+
+    def get_binding_includes(self, header_file, type_names=()):
+        header_file = os.path.abspath(header_file)
+        dependency_files = set(self.referenced_headers.get(header_file, set()))
+        dependency_files |= self.strong_dependencies.get(header_file, set())
+        dependency_files |= self.weak_dependencies.get(header_file, set())
+        for type_name in type_names:
+            dependency_file = self._find_type_definition_file(type_name, header_file)
+            if dependency_file:
+                dependency_files.add(dependency_file)
+        dependency_files.discard(header_file)
+
+        includes = set()
+        for dependency_file in dependency_files:
+            include = self._get_include_spelling(dependency_file)
+            if include:
+                includes.add(include)
+        return sorted(includes)
+
+    def _get_dependency_context(self):
+        definitions = json.dumps(self.type_definitions, sort_keys=True)
+        return {
+            "headers": sorted(self.header_files),
+            "definitions": hashlib.sha256(definitions.encode("utf-8")).hexdigest(),
+        }
+
+    def get_header_dependencies(self, header_file):
+        return {
+            "strong": sorted(self.strong_dependencies[header_file]),
+            "weak": sorted(self.weak_dependencies[header_file]),
+            "self_references": self.self_references[header_file],
+            "referenced_headers": sorted(self.referenced_headers[header_file]),
+        }
+
+    def set_header_dependencies(self, header_file, dependencies):
+        self.strong_dependencies[header_file].update(dependencies["strong"])
+        self.weak_dependencies[header_file].update(dependencies["weak"])
+        if dependencies["self_references"]:
+            self.self_references[header_file] += dependencies["self_references"]
+        self.referenced_headers[header_file].update(dependencies["referenced_headers"])
+
+    def collect_header_definitions(self, header_file):
+        print(f"  Analyzing {os.path.basename(header_file)}...")
+        if self.parse_cache is not None:
+            type_definitions = self.parse_cache.load_sorter("definitions", header_file, self.clang_args)
+            if type_definitions is not None:
+                print("    Type definitions loaded from the parse cache")
+                self.type_definitions.update(type_definitions)
+                return
 
-            except Exception as e:
-                print(f"Error while parsing {header_file}: {e}", file=sys.stderr)
+        try:
+            tu = self.tu_provider.get(header_file)
+            if not tu:
+                print(f"Warning: Failed to parse {header_file}", file=sys.stderr)
+                return
 
-        print("\nPhase 2: Analyzing dependencies...")
-        for header_file in self.header_files:
-            print(f"  Processing dependencies for {os.path.basename(header_file)}...")
+            type_definitions = self.type_definitions
+            self.type_definitions = {}
             try:
-                if not tus[header_file]:
-                    continue
+                self._collect_type_definitions(tu)
+                header_definitions = self.type_definitions
+            finally:
+                self.type_definitions = type_definitions
+            self.type_definitions.update(header_definitions)
+
+            if self.parse_cache is not None:
+                self.parse_cache.store_sorter(
+                    "definitions", header_file, self.clang_args, None, get_dependencies(tu), header_definitions
+                )
 
-                has_errors = False
-                for diag in tus[header_file].diagnostics:
-                    if diag.severity >= cindex.Diagnostic.Error:
-                        if "incomplete type" not in diag.spelling.lower():
-                            print(
-                                f"Error parsing {header_file}: {diag.spelling}",
-                                file=sys.stderr,
-                            )
-                            has_errors = True
-                if has_errors:
-                    print(
-                        f"  Continuing dependency analysis for {os.path.basename(header_file)} despite parsing errors (AST is usually still usable for inheritance/type info).",
-                        file=sys.stderr,
-                    )
+        except Exception as e:
+            print(f"Error while parsing {header_file}: {e}", file=sys.stderr)
+
+    def analyze_header_dependencies(self, header_file):
+        print(f"  Processing dependencies for {os.path.basename(header_file)}...")
+        context = None
+        if self.parse_cache is not None:
+            context = self._get_dependency_context()
+            dependencies = self.parse_cache.load_sorter("dependencies", header_file, self.clang_args, context)
+            if dependencies is not None:
+                print("    Dependencies loaded from the parse cache")
+                self.set_header_dependencies(header_file, dependencies)
+                return
 
-                self._analyze_dependencies(tus[header_file])
+        try:
+            tu = self.tu_provider.get(header_file)
+            if not tu:
+                return
+
+            has_errors = False
+            for diag in tu.diagnostics:
+                if diag.severity >= cindex.Diagnostic.Error:
+                    if "incomplete type" not in diag.spelling.lower():
+                        print(
+                            f"Error parsing {header_file}: {diag.spelling}",
+                            file=sys.stderr,
+                        )
+                        has_errors = True
+            if has_errors:
+                print(
+                    f"  Continuing dependency analysis for {os.path.basename(header_file)} despite parsing errors (AST is usually still usable for inheritance/type info).",
+                    file=sys.stderr,
+                )
+
+            self._analyze_dependencies(tu)
+            self._collect_referenced_headers(tu)
+
+            if self.parse_cache is not None:
+                self.parse_cache.store_sorter(
+                    "dependencies",
+                    header_file,
+                    self.clang_args,
+                    context,
+                    get_dependencies(tu),
+                    self.get_header_dependencies(header_file),
+                )
+
+        except Exception as e:
+            print(f"Error while processing {header_file}: {e}", file=sys.stderr)
+
+    def build_graph(self, executor=None):
+        print("Building dependency graph...")
 
-            except Exception as e:
-                print(f"Error while processing {header_file}: {e}", file=sys.stderr)
+        print("\nPhase 1: Collecting type definitions...")
+        if executor is None:
+            for header_file in self.header_files:
+                self.collect_header_definitions(header_file)
+        else:
+            from .workers import collect_definitions_job, replay_logs
+
+            header_paths = sorted(self.header_files)
+            futures = [
+                executor.submit(header_file, collect_definitions_job, header_paths, header_file)
+                for header_file in self.header_files
+            ]
+            for future in futures:
+                type_definitions, logs = future.result()
+                replay_logs(logs)
+                self.type_definitions.update(type_definitions)
+
+        print("\nPhase 2: Analyzing dependencies...")
+        if executor is None:
+            for header_file in self.header_files:
+                self.analyze_header_dependencies(header_file)
+        else:
+            from .workers import analyze_dependencies_job, replay_logs
+
+            futures = [
+                executor.submit(header_file, analyze_dependencies_job, header_paths, self.type_definitions, header_file)
+                for header_file in self.header_files
+            ]
+            for header_file, future in zip(self.header_files, futures):
+                dependencies, logs = future.result()
+                replay_logs(logs)
+                self.set_header_dependencies(header_file, dependencies)
 
         print("\nPhase 3: Building final dependency graph (strong dependencies only, self-references filtered)...")
         for header_file in self.header_files:
@@ -476,7 +633,7 @@ class Sorter:
 
     def sort(self):
         print("\nPerforming topological sort (based on strong dependencies only, self-references excluded)...")
-        in_degree = {node: len(self.dependency_graph[node]) for node in self.header_files}
+        in_degree = {node: len(self.dependency_graph[node]) for node in sorted(self.header_files)}
         queue = deque([node for node, degree in in_degree.items() if degree == 0])
         sorted_list = []
 
@@ -484,7 +641,7 @@ class Sorter:
             current_node = queue.popleft()
             sorted_list.append(current_node)
 
-            for dependent in self.dependents_graph.get(current_node, []):
+            for dependent in sorted(self.dependents_graph.get(current_node, [])):
                 in_degree[dependent] -= 1
                 if in_degree[dependent] == 0:
                     queue.append(dependent)
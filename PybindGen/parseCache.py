@@ -0,0 +1,120 @@
+import os
+import json
+import hashlib
+import clang.cindex
+
+CACHE_FORMAT_VERSION = 2
+
+
+def get_libclang_version():
+    lib = clang.cindex.conf.lib
+    try:
+        func = lib.clang_getClangVersion
+        func.restype = clang.cindex._CXString
+        return clang.cindex._CXString.from_result(func())
+    except Exception:
+        return f"unknown ({getattr(lib, '_name', '')})"
+
+
+def hash_file(file_path):
+    hasher = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                hasher.update(chunk)
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, cache_dir):
+        self._cache_dir = cache_dir
+        self._file_hashes = {}
+        self._libclang_version = get_libclang_version()
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        self._code_hashes = {
+            "parser": hash_file(os.path.join(package_dir, "hppParser.py")),
+            "definitions": hash_file(os.path.join(package_dir, "hppSorter.py")),
+            "dependencies": hash_file(os.path.join(package_dir, "hppSorter.py")),
+        }
+        self.hits = 0
+        self.misses = 0
+        self.sorter_hits = 0
+        self.sorter_misses = 0
+
+    def _hash_file(self, file_path):
+        if file_path not in self._file_hashes:
+            self._file_hashes[file_path] = hash_file(file_path)
+        return self._file_hashes[file_path]
+
+    def _entry_path(self, kind, hpp_file, args, context):
+        key = json.dumps(
+            {
+                "format": CACHE_FORMAT_VERSION,
+                "kind": kind,
+                "file": os.path.abspath(hpp_file),
+                "args": list(args),
+                "libclang": self._libclang_version,
+                "code": self._code_hashes[kind],
+                "context": context,
+            },
+            sort_keys=True,
+        )
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._cache_dir, f"{digest}.json")
+
+    def _load_entry(self, kind, hpp_file, args, context):
+        entry_path = self._entry_path(kind, hpp_file, args, context)
+        if not os.path.exists(entry_path):
+            return None
+        try:
+            with open(entry_path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable parse cache entry {entry_path}: {e}")
+            return None
+
+        for dep_path, dep_hash in entry.get("dependencies", {}).items():
+            if self._hash_file(dep_path) != dep_hash:
+                return None
+        return entry
+
+    def load(self, hpp_file, args):
+        entry = self._load_entry("parser", hpp_file, args, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        print(f"Parse cache hit for {os.path.basename(hpp_file)}")
+        return entry["items"]
+
+    def store(self, hpp_file, args, dependencies, items):
+        self._store_entry("parser", hpp_file, args, None, dependencies, items)
+
+    def load_sorter(self, kind, hpp_file, args, context=None):
+        entry = self._load_entry(kind, hpp_file, args, context)
+        if entry is None:
+            self.sorter_misses += 1
+            return None
+        self.sorter_hits += 1
+        return entry["items"]
+
+    def store_sorter(self, kind, hpp_file, args, context, dependencies, items):
+        self._store_entry(kind, hpp_file, args, context, dependencies, items)
+
+    def _store_entry(self, kind, hpp_file, args, context, dependencies, items):
+        dependency_hashes = {}
+        for dep_path in dependencies:
+            dep_hash = self._hash_file(dep_path)
+            if dep_hash is None:
+                print(f"Warning: Not caching {os.path.basename(hpp_file)}, cannot read dependency {dep_path}")
+                return
+            dependency_hashes[dep_path] = dep_hash
+
+        entry_path = self._entry_path(kind, hpp_file, args, context)
+        os.makedirs(self._cache_dir, exist_ok=True)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"dependencies": dependency_hashes, "items": items}, file)
+        os.replace(tmp_path, entry_path)
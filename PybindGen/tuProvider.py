@@ -0,0 +1,43 @@
+import os
+import sys
+import clang.cindex
+from .utils import get_macos_clang_args
+
+
+def get_clang_args(include_dirs, cpp_version, ignored_macros):
+    args = ["-x", "c++-header", f"-std={cpp_version}"]
+    for include_dir in include_dirs:
+        args.append(f"-I{os.path.abspath(include_dir)}")
+    args.extend(f"-D{macro}=" for macro in ignored_macros)
+    args.append("-fno-delayed-template-parsing")
+    if sys.platform == "darwin":
+        args.extend(get_macos_clang_args())
+    return args
+
+
+def get_dependencies(translation_unit):
+    dependencies = [os.path.realpath(translation_unit.spelling)]
+    for inclusion in translation_unit.get_includes():
+        included_path = os.path.realpath(inclusion.include.name)
+        if included_path not in dependencies:
+            dependencies.append(included_path)
+    return dependencies
+
+
+class TranslationUnitProvider:
+    def __init__(self, clang_args):
+        self.clang_args = list(clang_args)
+        self._index = clang.cindex.Index.create()
+        self._translation_units = {}
+        self.parse_count = 0
+
+    def get(self, header_file):
+        header_path = os.path.abspath(header_file)
+        if header_path not in self._translation_units:
+            self._translation_units[header_path] = self._index.parse(
+                header_path,
+                args=self.clang_args,
+                options=clang.cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD,
+            )
+            self.parse_count += 1
+        return self._translation_units[header_path]
@@ -22,6 +22,33 @@ def scan_hpp_files(hpp_root, repo_root, parse_folders):
     return hpp_folders
 
 
+def write_if_changed(file_path, content):
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
+def remove_stale_files(folder, pattern, expected_files):
+    removed = []
+    if not os.path.isdir(folder):
+        return removed
+
+    expected = {os.path.abspath(f) for f in expected_files}
+    for filename in sorted(os.listdir(folder)):
+        file_path = os.path.abspath(os.path.join(folder, filename))
+        if re.fullmatch(pattern, filename) and file_path not in expected:
+            os.remove(file_path)
+            removed.append(file_path)
+    return removed
+
+
 def normalize_type(type_str):
     result = re.sub(r"\bconst\b|\bvolatile\b", "", type_str)
     result = re.sub(r"\s+", " ", result).strip()
@@ -0,0 +1,110 @@
+import io
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+from .hppSorter import Sorter
+from .parseCache import ParseCache
+from .tuProvider import TranslationUnitProvider
+
+_worker_state = {}
+
+
+class ShardedExecutor:
+    # One single-process pool per worker: every job for a header goes to the same worker, so the binding pass and
+    # both sorter phases reuse the translation unit that worker already parsed instead of parsing it again elsewhere.
+    def __init__(self, max_workers, initializer, initargs):
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, initializer=initializer, initargs=initargs) for _ in range(max_workers)
+        ]
+        self._shards = {}
+
+    def submit(self, header_file, func, *args):
+        header_path = os.path.abspath(header_file)
+        if header_path not in self._shards:
+            self._shards[header_path] = len(self._shards) % len(self._executors)
+        return self._executors[self._shards[header_path]].submit(func, *args)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        for executor in self._executors:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(cancel_futures=exc_type is not None)
+        return False
+
+
+def init_worker(clang_args, cache_dir, generator_config):
+    _worker_state["tu_provider"] = TranslationUnitProvider(clang_args)
+    _worker_state["parse_cache"] = ParseCache(cache_dir) if cache_dir else None
+    _worker_state["generator_config"] = generator_config
+    _worker_state["sorters"] = {}
+
+
+def replay_logs(logs):
+    out, err = logs
+    if out:
+        sys.stdout.write(out)
+    if err:
+        sys.stderr.write(err)
+
+
+def _run_captured(func, *args):
+    out = io.StringIO()
+    err = io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        result = func(*args)
+    return result, (out.getvalue(), err.getvalue())
+
+
+def _get_sorter(header_paths):
+    key = tuple(header_paths)
+    sorters = _worker_state["sorters"]
+    if key not in sorters:
+        with redirect_stdout(io.StringIO()):
+            sorters[key] = Sorter(header_paths, _worker_state["tu_provider"], _worker_state["parse_cache"])
+    return sorters[key]
+
+
+def generate_binding_job(common_module_name, hpp_root, hpp_file, output_file):
+    from . import generate_binding_from_hpp
+
+    parse_cache = _worker_state["parse_cache"]
+    hits = parse_cache.hits if parse_cache else 0
+    misses = parse_cache.misses if parse_cache else 0
+    _, logs = _run_captured(
+        generate_binding_from_hpp,
+        common_module_name,
+        hpp_root,
+        hpp_file,
+        output_file,
+        _worker_state["tu_provider"],
+        *_worker_state["generator_config"],
+        parse_cache,
+    )
+    if parse_cache:
+        hits = parse_cache.hits - hits
+        misses = parse_cache.misses - misses
+    return output_file, logs, hits, misses
+
+
+def collect_definitions_job(header_paths, header_file):
+    sorter = _get_sorter(header_paths)
+    sorter.type_definitions = {}
+    _, logs = _run_captured(sorter.collect_header_definitions, header_file)
+    return sorter.type_definitions, logs
+
+
+def analyze_dependencies_job(header_paths, type_definitions, header_file):
+    sorter = _get_sorter(header_paths)
+    sorter.type_definitions = type_definitions
+    sorter.strong_dependencies = defaultdict(set)
+    sorter.weak_dependencies = defaultdict(set)
+    sorter.self_references = defaultdict(int)
+    sorter.referenced_headers = defaultdict(set)
+    _, logs = _run_captured(sorter.analyze_header_dependencies, header_file)
+    return sorter.get_header_dependencies(header_file), logs
@@ -15,7 +15,9 @@ if not exist "PySFEnv\Scripts\activate.bat" (
 )
 call PySFEnv\Scripts\activate
 
-python parse.py
+set "PARSE_ARGS="
+if defined PYSF_INCREMENTAL set "PARSE_ARGS=--incremental"
+python parse.py %PARSE_ARGS%
 if errorlevel 1 exit /b %errorlevel%
 
 call ProjCMake.bat
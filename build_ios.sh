@@ -17,6 +17,10 @@ if ! [ -f "PySFEnv/bin/activate" ]; then
 fi
 source PySFEnv/bin/activate
 
-python3 parse.py
+parse_args=()
+if [ -n "$PYSF_INCREMENTAL" ]; then
+    parse_args+=(--incremental)
+fi
+python3 parse.py "${parse_args[@]}"
 
 ./ProjCMake_ios.sh
@@ -0,0 +1,30 @@
+#pragma once
+
+#include <cstdint>
+#include <functional>
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+class AudioFrameView {
+public:
+    explicit AudioFrameView(bool readonly);
+
+    void reset(float* frames, unsigned int frameCount, unsigned int channelCount);
+    void release();
+
+    float* frames = nullptr;
+    py::ssize_t frameCount = 0;
+    py::ssize_t channelCount = 0;
+    bool readonly;
+};
+
+using EffectProcessorFunction = std::function<void(const float*, unsigned int&, float*, unsigned int&, unsigned int)>;
+
+using NativeEffectProcessor = void (*)(const float* inputFrames, unsigned int* inputFrameCount, float* outputFrames, unsigned int* outputFrameCount, unsigned int frameChannelCount, void* userData);
+
+EffectProcessorFunction native_effect_processor(const py::object& function, std::uintptr_t userData);
+
+void bind_audio_frame_view(py::module& m);
+
+void bind_ring_buffer_sound_stream(py::module& m);
@@ -0,0 +1,53 @@
+#pragma once
+
+#include "SFML/Graphics/Rect.hpp"
+#include "SFML/System/Vector2.hpp"
+#include <cstddef>
+#include <optional>
+#include <vector>
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+namespace sf {
+    class Image;
+    class Transformable;
+    class VertexArray;
+}
+
+std::vector<sf::Transformable*> transformable_pointers(const py::sequence& objects);
+
+void transformable_set_positions(const py::sequence& objects, const py::object& positions);
+
+void transformable_set_rotations(const py::sequence& objects, const py::object& angles);
+
+void transformable_set_scales(const py::sequence& objects, const py::object& factors);
+
+void transformable_set_origins(const py::sequence& objects, const py::object& origins);
+
+py::object transformable_get_positions(const py::sequence& objects);
+
+py::object transformable_get_rotations(const py::sequence& objects);
+
+py::object transformable_get_scales(const py::sequence& objects);
+
+void vertex_array_fill_quads(
+    sf::VertexArray& vertexArray,
+    const py::object& positions,
+    const py::object& sizes,
+    const py::object& textureRects,
+    const py::object& colors,
+    const py::object& rotations,
+    std::size_t first
+);
+
+void vertex_array_fill_tile_map(
+    sf::VertexArray& vertexArray,
+    const py::buffer& tiles,
+    sf::Vector2f tileSize,
+    unsigned int tilesetColumns,
+    std::optional<sf::Vector2f> textureTileSize,
+    std::optional<sf::IntRect> region
+);
+
+py::tuple image_pack_atlas(const py::sequence& images, unsigned int maxSize, unsigned int padding, unsigned int workers);
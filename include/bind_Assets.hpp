@@ -0,0 +1,63 @@
+#pragma once
+
+#include "utils.hpp"
+#include <cstddef>
+#include <cstdint>
+#include <filesystem>
+#include <list>
+#include <optional>
+#include <string>
+#include <unordered_map>
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+class AssetCache {
+public:
+    AssetCache(std::size_t maxBytes, bool hashContent);
+
+    py::object load(const py::object& type, const py::object& path);
+    py::list loadMany(const py::iterable& specs, unsigned int workers);
+
+    void clear();
+    void setMaxBytes(std::size_t maxBytes);
+
+    std::size_t getMaxBytes() const;
+    std::size_t getSize() const;
+    std::size_t getCount() const;
+    std::uint64_t getHitCount() const;
+    std::uint64_t getMissCount() const;
+    std::uint64_t getEvictionCount() const;
+
+private:
+    struct Entry {
+        std::string key;
+        py::object asset;
+        std::size_t bytes;
+    };
+
+    struct ContentDigest {
+        std::filesystem::file_time_type writeTime;
+        std::uintmax_t size;
+        std::string digest;
+    };
+
+    std::optional<std::string> cacheKey(std::size_t kind, const std::string& filename);
+    void insert(const std::string& key, const py::object& asset, std::size_t bytes);
+    void evict();
+    void pruneDigests();
+
+    std::size_t m_maxBytes;
+    bool m_hashContent;
+    std::list<Entry> m_entries;
+    std::unordered_map<std::string, std::list<Entry>::iterator> m_index;
+    std::unordered_map<std::string, ContentDigest> m_digests;
+    std::size_t m_bytes = 0;
+    std::uint64_t m_hits = 0;
+    std::uint64_t m_misses = 0;
+    std::uint64_t m_evictions = 0;
+};
+
+py::list load_many(const py::iterable& specs, unsigned int workers);
+
+void bind_Assets(py::module &m_sf);
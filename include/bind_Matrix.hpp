@@ -1,5 +1,7 @@
 #pragma once
 
+#include "SFML/Graphics/Glsl.hpp"
+#include "SFML/Graphics/Transform.hpp"
 #include "utils.hpp"
 #include <string>
 
@@ -1,5 +1,6 @@
 #pragma once
 
+#include "SFML/Graphics/Rect.hpp"
 #include "utils.hpp"
 #include <string>
 
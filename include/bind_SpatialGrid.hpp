@@ -0,0 +1,60 @@
+#pragma once
+
+#include "SFML/Graphics/Rect.hpp"
+#include "SFML/System/Vector2.hpp"
+#include "utils.hpp"
+#include <cstddef>
+#include <cstdint>
+#include <shared_mutex>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+namespace py = pybind11;
+
+class SpatialGrid {
+public:
+    explicit SpatialGrid(float cellSize);
+
+    void assign(const sf::FloatRect* rects, std::size_t count);
+    void update(const std::vector<std::int64_t>& ids, const sf::FloatRect* rects, std::size_t count);
+
+    std::vector<std::uint32_t> query(const sf::FloatRect& rect) const;
+    std::vector<std::uint32_t> queryPoint(sf::Vector2f point) const;
+    std::vector<std::uint32_t> allPairs() const;
+
+    std::size_t size() const;
+    float getCellSize() const;
+    sf::FloatRect getRect(std::int64_t id) const;
+
+private:
+    struct CellRange {
+        std::int32_t left;
+        std::int32_t top;
+        std::int32_t right;
+        std::int32_t bottom;
+    };
+
+    // Rectangles covering more cells are kept in an overflow list checked by every query instead.
+    static constexpr std::uint64_t MaxCellsPerRect = 64;
+
+    static std::int64_t cellKey(std::int32_t x, std::int32_t y);
+    static std::uint64_t cellCount(const CellRange& range);
+    static void checkFinite(const sf::FloatRect* rects, std::size_t count);
+
+    std::int32_t cellCoordinate(float value) const;
+    CellRange cellRange(const sf::FloatRect& rect) const;
+    std::uint32_t checkedId(std::int64_t id) const;
+    void insert(std::uint32_t id);
+    void remove(std::uint32_t id);
+
+    float m_cellSize;
+    std::vector<sf::FloatRect> m_rects;
+    std::vector<CellRange> m_ranges;
+    std::unordered_map<std::int64_t, std::vector<std::uint32_t>> m_cells;
+    std::vector<std::uint32_t> m_overflow;
+    // The bindings release the GIL, so queries share the lock and assign / update take it exclusively.
+    mutable std::shared_mutex m_mutex;
+};
+
+void bind_SpatialGrid(py::module &m_sf);
@@ -1,5 +1,9 @@
 #pragma once
 
+#include "SFML/System/Angle.hpp"
+#include "SFML/System/Vector2.hpp"
+#include "SFML/System/Vector3.hpp"
+#include "SFML/Graphics/Glsl.hpp"
 #include "utils.hpp"
 #include <string>
 #include <vector>
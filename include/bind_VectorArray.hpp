@@ -0,0 +1,60 @@
+#pragma once
+
+#include "SFML/System/Angle.hpp"
+#include "SFML/System/Vector2.hpp"
+#include "SFML/System/Vector3.hpp"
+#include "utils.hpp"
+#include <cstddef>
+#include <string>
+#include <vector>
+
+namespace py = pybind11;
+
+template <typename V>
+class VectorArray {
+public:
+    using Scalar = decltype(V::x);
+    static constexpr py::ssize_t Dimension = sizeof(V) / sizeof(Scalar);
+
+    VectorArray() = default;
+    explicit VectorArray(std::size_t size);
+    explicit VectorArray(const py::object& vectors);
+
+    std::size_t size() const;
+    V* data();
+    const V* data() const;
+
+    V& at(py::ssize_t index);
+
+    std::vector<V> vectors;
+};
+
+template <typename V>
+void require_same_size(const VectorArray<V>& left, const VectorArray<V>& right);
+
+template <typename V, typename Function>
+VectorArray<V> map_vectors(const VectorArray<V>& array, Function function);
+
+template <typename V, typename Function>
+VectorArray<V> zip_vectors(const VectorArray<V>& left, const VectorArray<V>& right, Function function);
+
+template <typename V, typename Function>
+py::object map_scalars(const VectorArray<V>& array, Function function);
+
+template <typename V, typename Function>
+py::object zip_scalars(const VectorArray<V>& left, const VectorArray<V>& right, Function function);
+
+std::string getVectorArrayDesc(int dimension);
+
+template <typename V>
+void bind_VectorArrayT_Common(py::class_<VectorArray<V>>& v_sfVectorArray, const std::string& name);
+
+template <typename T>
+void bind_Vector2ArrayT(py::module &m_sf, const std::string& name);
+
+template <typename T>
+void bind_Vector3ArrayT(py::module &m_sf, const std::string& name);
+
+void bind_VectorArray(py::module &m_sf);
+
+#include "bind_VectorArray.inl"
@@ -0,0 +1,176 @@
+#include <cmath>
+#include <sstream>
+#include <string>
+
+template <typename V>
+VectorArray<V>::VectorArray(std::size_t size) : vectors(size) {}
+
+template <typename V>
+VectorArray<V>::VectorArray(const py::object& vectors) {
+    BufferView<V, Scalar> view(vectors);
+    this->vectors.assign(view.data(), view.data() + view.size());
+}
+
+template <typename V>
+std::size_t VectorArray<V>::size() const {
+    return vectors.size();
+}
+
+template <typename V>
+V* VectorArray<V>::data() {
+    return vectors.data();
+}
+
+template <typename V>
+const V* VectorArray<V>::data() const {
+    return vectors.data();
+}
+
+template <typename V>
+V& VectorArray<V>::at(py::ssize_t index) {
+    const py::ssize_t size = static_cast<py::ssize_t>(vectors.size());
+    if (index < 0) {
+        index += size;
+    }
+    if (index < 0 || index >= size) {
+        throw py::index_error("vector array index out of range");
+    }
+    return vectors[static_cast<std::size_t>(index)];
+}
+
+template <typename V>
+void require_same_size(const VectorArray<V>& left, const VectorArray<V>& right) {
+    if (left.size() != right.size()) {
+        throw py::value_error(
+            "vector arrays must have the same size, got " + std::to_string(left.size()) + " and " + std::to_string(right.size())
+        );
+    }
+}
+
+template <typename V, typename Function>
+VectorArray<V> map_vectors(const VectorArray<V>& array, Function function) {
+    VectorArray<V> result(array.size());
+    for (std::size_t i = 0; i < array.size(); ++i) {
+        result.vectors[i] = function(array.vectors[i]);
+    }
+    return result;
+}
+
+template <typename V, typename Function>
+VectorArray<V> zip_vectors(const VectorArray<V>& left, const VectorArray<V>& right, Function function) {
+    require_same_size(left, right);
+    VectorArray<V> result(left.size());
+    for (std::size_t i = 0; i < left.size(); ++i) {
+        result.vectors[i] = function(left.vectors[i], right.vectors[i]);
+    }
+    return result;
+}
+
+template <typename V, typename Function>
+py::object map_scalars(const VectorArray<V>& array, Function function) {
+    float* result = nullptr;
+    py::object output = new_float_buffer(static_cast<py::ssize_t>(array.size()), &result);
+    for (std::size_t i = 0; i < array.size(); ++i) {
+        result[i] = function(array.vectors[i]);
+    }
+    return output;
+}
+
+template <typename V, typename Function>
+py::object zip_scalars(const VectorArray<V>& left, const VectorArray<V>& right, Function function) {
+    require_same_size(left, right);
+    float* result = nullptr;
+    py::object output = new_float_buffer(static_cast<py::ssize_t>(left.size()), &result);
+    for (std::size_t i = 0; i < left.size(); ++i) {
+        result[i] = function(left.vectors[i], right.vectors[i]);
+    }
+    return output;
+}
+
+template <typename V>
+void bind_VectorArrayT_Common(py::class_<VectorArray<V>>& v_sfVectorArray, const std::string& name) {
+    using A = VectorArray<V>;
+    using T = typename A::Scalar;
+
+    v_sfVectorArray.def(py::init<>(), "\\brief Default constructor\n\nCreates an empty vector array.");
+    v_sfVectorArray.def(py::init<std::size_t>(), "\\brief Construct a vector array of zero vectors\n\n- \\param size Number of vectors", py::arg("size"));
+    v_sfVectorArray.def(py::init<const py::object&>(), "\\brief Construct the vector array from vectors\n\nA C-contiguous float32 buffer (such as a NumPy array of shape `(N, dimension)`)\nis copied in one go, any other sequence is converted vector by vector.\n\n- \\param vectors Buffer or sequence of vectors", py::arg("vectors"));
+    v_sfVectorArray.def_buffer([](A& self) {
+        return py::buffer_info(
+            self.data(),
+            sizeof(T),
+            py::format_descriptor<T>::format(),
+            2,
+            { static_cast<py::ssize_t>(self.size()), A::Dimension },
+            { static_cast<py::ssize_t>(sizeof(V)), static_cast<py::ssize_t>(sizeof(T)) }
+        );
+    });
+    v_sfVectorArray.def("__len__", [](A& self) { return self.size(); });
+    v_sfVectorArray.def("__getitem__", [](A& self, py::ssize_t index) { return self.at(index); }, py::arg("index"));
+    v_sfVectorArray.def("__setitem__", [](A& self, py::ssize_t index, V value) { self.at(index) = value; }, py::arg("index"), py::arg("value"));
+    v_sfVectorArray.def("append", [](A& self, V value) { self.vectors.push_back(value); }, "\\brief Add a vector at the end of the array", py::arg("value"));
+    v_sfVectorArray.def("resize", [](A& self, std::size_t size) { self.vectors.resize(size); }, "\\brief Resize the array, new vectors are zero vectors\n\nViews of the array become invalid after resizing.", py::arg("size"));
+    v_sfVectorArray.def("toList", [](A& self) { return self.vectors; }, "\\brief Copy the vectors into a list of vectors");
+    v_sfVectorArray.def("lengthSquared", [](A& self) { return map_scalars(self, [](const V& v) { return v.lengthSquared(); }); }, "\\brief Square of the length of every vector.\n\n\\return Float32 memoryview of shape `(N,)`");
+    v_sfVectorArray.def("length", [](A& self) { return map_scalars(self, [](const V& v) { return v.length(); }); }, "\\brief Length of every vector.\n\n\\return Float32 memoryview of shape `(N,)`");
+    v_sfVectorArray.def("normalized", [](A& self) { return map_vectors(self, [](const V& v) { return v.normalized(); }); }, "\\brief Vectors with same direction but length 1.\n\n\\pre No vector is a zero vector.");
+    v_sfVectorArray.def("dot", [](A& self, const A& rhs) { return zip_scalars(self, rhs, [](const V& l, const V& r) { return l.dot(r); }); }, "\\brief Dot product of every pair of vectors.\n\n\\return Float32 memoryview of shape `(N,)`", py::arg("rhs"));
+    v_sfVectorArray.def("dot", [](A& self, V rhs) { return map_scalars(self, [rhs](const V& v) { return v.dot(rhs); }); }, "\\brief Dot product of every vector with `rhs`.\n\n\\return Float32 memoryview of shape `(N,)`", py::arg("rhs"));
+    v_sfVectorArray.def("componentWiseMul", [](A& self, const A& rhs) { return zip_vectors(self, rhs, [](const V& l, const V& r) { return l.componentWiseMul(r); }); }, "\\brief Component-wise multiplication of every pair of vectors.", py::arg("rhs"));
+    v_sfVectorArray.def("componentWiseMul", [](A& self, V rhs) { return map_vectors(self, [rhs](const V& v) { return v.componentWiseMul(rhs); }); }, "\\brief Component-wise multiplication of every vector by `rhs`.", py::arg("rhs"));
+    v_sfVectorArray.def("componentWiseDiv", [](A& self, const A& rhs) { return zip_vectors(self, rhs, [](const V& l, const V& r) { return l.componentWiseDiv(r); }); }, "\\brief Component-wise division of every pair of vectors.\n\n\\pre No component of `rhs` is zero.", py::arg("rhs"));
+    v_sfVectorArray.def("componentWiseDiv", [](A& self, V rhs) { return map_vectors(self, [rhs](const V& v) { return v.componentWiseDiv(rhs); }); }, "\\brief Component-wise division of every vector by `rhs`.\n\n\\pre Neither component of `rhs` is zero.", py::arg("rhs"));
+    v_sfVectorArray.def("__add__", [](A& self, const A& right) { return zip_vectors(self, right, [](const V& l, const V& r) { return l + r; }); }, py::arg("right"));
+    v_sfVectorArray.def("__add__", [](A& self, V right) { return map_vectors(self, [right](const V& v) { return v + right; }); }, py::arg("right"));
+    v_sfVectorArray.def("__sub__", [](A& self, const A& right) { return zip_vectors(self, right, [](const V& l, const V& r) { return l - r; }); }, py::arg("right"));
+    v_sfVectorArray.def("__sub__", [](A& self, V right) { return map_vectors(self, [right](const V& v) { return v - right; }); }, py::arg("right"));
+    v_sfVectorArray.def("__mul__", [](A& self, T right) { return map_vectors(self, [right](const V& v) { return v * right; }); }, py::arg("right"));
+    v_sfVectorArray.def("__rmul__", [](A& self, T left) { return map_vectors(self, [left](const V& v) { return left * v; }); }, py::arg("left"));
+    v_sfVectorArray.def("__truediv__", [](A& self, T right) { return map_vectors(self, [right](const V& v) { return v / right; }); }, py::arg("right"));
+    v_sfVectorArray.def("__neg__", [](A& self) { return map_vectors(self, [](const V& v) { return -v; }); });
+    v_sfVectorArray.def("__iadd__", [](A& self, const A& right) -> A& { require_same_size(self, right); for (std::size_t i = 0; i < self.size(); ++i) self.vectors[i] += right.vectors[i]; return self; }, py::return_value_policy::reference, py::arg("right"));
+    v_sfVectorArray.def("__iadd__", [](A& self, V right) -> A& { for (V& v : self.vectors) v += right; return self; }, py::return_value_policy::reference, py::arg("right"));
+    v_sfVectorArray.def("__isub__", [](A& self, const A& right) -> A& { require_same_size(self, right); for (std::size_t i = 0; i < self.size(); ++i) self.vectors[i] -= right.vectors[i]; return self; }, py::return_value_policy::reference, py::arg("right"));
+    v_sfVectorArray.def("__isub__", [](A& self, V right) -> A& { for (V& v : self.vectors) v -= right; return self; }, py::return_value_policy::reference, py::arg("right"));
+    v_sfVectorArray.def("__imul__", [](A& self, T right) -> A& { for (V& v : self.vectors) v *= right; return self; }, py::return_value_policy::reference, py::arg("right"));
+    v_sfVectorArray.def("__itruediv__", [](A& self, T right) -> A& { for (V& v : self.vectors) v /= right; return self; }, py::return_value_policy::reference, py::arg("right"));
+    v_sfVectorArray.def("__eq__", [](A& self, const A& right) { return self.vectors == right.vectors; }, py::arg("right"));
+    v_sfVectorArray.def("__ne__", [](A& self, const A& right) { return self.vectors != right.vectors; }, py::arg("right"));
+    v_sfVectorArray.def("__repr__", [name](A& self) {
+        std::stringstream ss;
+        ss << name << "(" << self.size() << " vectors)";
+        return ss.str();
+    });
+    add_copy_support(v_sfVectorArray);
+}
+
+template <typename T>
+void bind_Vector2ArrayT(py::module &m_sf, const std::string& name) {
+    using V = sf::Vector2<T>;
+    using A = VectorArray<V>;
+
+    auto v_sfVector2Array = py::class_<A>(m_sf, name.c_str(), getVectorArrayDesc(2).c_str(), py::buffer_protocol());
+    bind_VectorArrayT_Common(v_sfVector2Array, name);
+    v_sfVector2Array.def("cross", [](A& self, const A& rhs) { return zip_scalars(self, rhs, [](const V& l, const V& r) { return l.cross(r); }); }, "\\brief Z component of the cross product of every pair of vectors.\n\n\\return Float32 memoryview of shape `(N,)`", py::arg("rhs"));
+    v_sfVector2Array.def("cross", [](A& self, V rhs) { return map_scalars(self, [rhs](const V& v) { return v.cross(rhs); }); }, "\\brief Z component of the cross product of every vector with `rhs`.\n\n\\return Float32 memoryview of shape `(N,)`", py::arg("rhs"));
+    v_sfVector2Array.def("perpendicular", [](A& self) { return map_vectors(self, [](const V& v) { return v.perpendicular(); }); }, "\\brief Every vector rotated by +90 degrees; (x,y) becomes (-y,x).");
+    v_sfVector2Array.def("angle", [](A& self) { return map_scalars(self, [](const V& v) { return v.angle().asRadians(); }); }, "\\brief Signed angle from +X or (1,0) vector of every vector.\n\n\\return Float32 memoryview of shape `(N,)` with angles in radians in the range [-pi, pi).\n\\pre No vector is a zero vector.");
+    v_sfVector2Array.def("rotatedBy", [](A& self, sf::Angle phi) {
+        const T cos = std::cos(phi.asRadians());
+        const T sin = std::sin(phi.asRadians());
+        return map_vectors(self, [cos, sin](const V& v) { return V(cos * v.x - sin * v.y, sin * v.x + cos * v.y); });
+    }, "\\brief Rotate every vector by angle \\c phi.\n\nIn SFML's default coordinate system with +X right and +Y down,\nthis amounts to a clockwise rotation by `phi`.", py::arg("phi"));
+    v_sfVector2Array.def("projectedOnto", [](A& self, const A& axis) { return zip_vectors(self, axis, [](const V& v, const V& a) { return v.projectedOnto(a); }); }, "\\brief Projection of every vector onto the matching axis.\n\n\\pre No axis has length zero.", py::arg("axis"));
+    v_sfVector2Array.def("projectedOnto", [](A& self, V axis) { return map_vectors(self, [axis](const V& v) { return v.projectedOnto(axis); }); }, "\\brief Projection of every vector onto `axis`.\n\n- \\param axis Vector being projected onto. Need not be normalized.\n\\pre `axis` must not have length zero.", py::arg("axis"));
+}
+
+template <typename T>
+void bind_Vector3ArrayT(py::module &m_sf, const std::string& name) {
+    using V = sf::Vector3<T>;
+    using A = VectorArray<V>;
+
+    auto v_sfVector3Array = py::class_<A>(m_sf, name.c_str(), getVectorArrayDesc(3).c_str(), py::buffer_protocol());
+    bind_VectorArrayT_Common(v_sfVector3Array, name);
+    v_sfVector3Array.def("cross", [](A& self, const A& rhs) { return zip_vectors(self, rhs, [](const V& l, const V& r) { return l.cross(r); }); }, "\\brief Cross product of every pair of vectors.", py::arg("rhs"));
+    v_sfVector3Array.def("cross", [](A& self, V rhs) { return map_vectors(self, [rhs](const V& v) { return v.cross(rhs); }); }, "\\brief Cross product of every vector with `rhs`.", py::arg("rhs"));
+}
@@ -0,0 +1,102 @@
+#pragma once
+
+#include "SFML/System/Vector2.hpp"
+#include <cstddef>
+#include <cstdint>
+#include <optional>
+#include <string>
+#include <vector>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+namespace py = pybind11;
+
+namespace sf {
+    class Image;
+    class InputSoundFile;
+    class SoundBuffer;
+    class Transform;
+    class VertexArray;
+}
+
+void require_c_contiguous(const py::buffer_info& info, const char* name);
+
+void require_buffer_length(std::size_t size, std::uint64_t required, const char* name);
+
+py::object new_float_buffer(py::ssize_t count, float** data);
+
+py::object new_float_buffer(py::ssize_t rows, py::ssize_t columns, float** data);
+
+py::object new_index_buffer(const std::vector<std::uint32_t>& indices, py::ssize_t columns = 1);
+
+std::vector<std::int64_t> read_indices(const py::object& indices);
+
+py::object load_mapped(const std::string& path);
+
+template <typename Scalar>
+bool buffer_format_matches(const py::buffer_info& info);
+
+template <typename T, typename Scalar = T>
+class BufferView {
+public:
+    BufferView(const py::object& data, bool writable = false);
+
+    T* data() const;
+    std::size_t size() const;
+
+    operator T*() const;
+
+private:
+    std::optional<py::buffer_info> m_info;
+    std::vector<T> m_storage;
+    T* m_data = nullptr;
+    std::size_t m_size = 0;
+};
+
+class RawBufferView {
+public:
+    RawBufferView(const py::object& data, bool writable = false);
+
+    void* data() const;
+    std::size_t size() const;
+
+    operator void*() const;
+
+private:
+    py::buffer_info m_info;
+};
+
+// Counts the buffers exported by the instances of a class bound with py::buffer_protocol().
+void track_buffer_exports(py::handle cls);
+
+// Raises BufferError while the object exports a buffer, like a bytearray that is resized while a memoryview exists.
+void require_no_buffer_exports(py::handle owner);
+
+void require_no_buffer_exports(const sf::Image& image);
+
+void require_no_buffer_exports(const sf::VertexArray& vertexArray);
+
+// Call policy rejecting the call while self exports a buffer, for the methods that reallocate its storage.
+struct reject_buffer_exports {};
+
+py::buffer_info image_buffer_info(sf::Image& image);
+
+void image_set_pixels(sf::Image& image, const py::buffer& pixels, std::optional<sf::Vector2u> size);
+
+py::buffer_info sound_buffer_info(sf::SoundBuffer& soundBuffer);
+
+std::uint64_t input_sound_file_read_into(sf::InputSoundFile& file, const py::object& samples);
+
+const std::string& vertex_buffer_format();
+
+py::buffer_info vertex_array_buffer_info(sf::VertexArray& vertexArray);
+
+void vertex_array_assign(sf::VertexArray& vertexArray, const py::object& vertices);
+
+py::object transform_matrix_view(const sf::Transform& transform);
+
+py::object transform_points(const sf::Transform& transform, const py::object& points);
+
+py::object transform_rects(const sf::Transform& transform, const py::object& rects);
+
+#include "buffer_utils.inl"
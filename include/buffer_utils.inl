@@ -0,0 +1,99 @@
+#include <cstring>
+#include <string>
+#include <type_traits>
+
+namespace py = pybind11;
+
+template <typename Scalar>
+bool buffer_format_matches(const py::buffer_info& info) {
+    if (info.itemsize != static_cast<py::ssize_t>(sizeof(Scalar))) {
+        return false;
+    }
+
+    std::string format = info.format;
+    if (!format.empty() && std::strchr("@=<>!", format[0])) {
+        format.erase(0, 1);
+    }
+    if (format.size() != 1) {
+        return false;
+    }
+
+    if constexpr (std::is_same_v<Scalar, bool>) {
+        return format[0] == '?';
+    } else if constexpr (std::is_floating_point_v<Scalar>) {
+        return std::strchr("efd", format[0]) != nullptr;
+    } else if constexpr (std::is_integral_v<Scalar> && std::is_signed_v<Scalar>) {
+        return std::strchr("bhilqn", format[0]) != nullptr;
+    } else if constexpr (std::is_integral_v<Scalar>) {
+        return std::strchr("BHILQN", format[0]) != nullptr;
+    } else {
+        return format == py::format_descriptor<Scalar>::format();
+    }
+}
+
+template <typename T, typename Scalar>
+BufferView<T, Scalar>::BufferView(const py::object& data, bool writable) {
+    static_assert(sizeof(T) % sizeof(Scalar) == 0, "BufferView element size must be a multiple of its scalar size");
+
+    if (writable && !PyObject_CheckBuffer(data.ptr())) {
+        // The callee would write into a temporary copy (or a null pointer) and the caller would never see the data.
+        throw py::type_error("expected a writable buffer-protocol object, got " + std::string(py::str(py::type::of(data).attr("__name__"))));
+    }
+
+    if (data.is_none()) {
+        return;
+    }
+
+    if (!PyObject_CheckBuffer(data.ptr())) {
+        m_storage = data.cast<std::vector<T>>();
+        m_data = m_storage.data();
+        m_size = m_storage.size();
+        return;
+    }
+
+    m_info = py::reinterpret_borrow<py::buffer>(data).request(writable);
+    require_c_contiguous(*m_info, "buffer");
+
+    const bool isRecord = !std::is_arithmetic_v<T> && m_info->itemsize == static_cast<py::ssize_t>(sizeof(T)) &&
+                          m_info->format.find("T{") != std::string::npos;
+    if (!isRecord && !buffer_format_matches<Scalar>(*m_info)) {
+        throw py::type_error(
+            "buffer has format '" + m_info->format + "' with item size " + std::to_string(m_info->itemsize) +
+            ", expected '" + py::format_descriptor<Scalar>::format() + "' items of " + std::to_string(sizeof(Scalar)) + " bytes"
+        );
+    }
+
+    const std::size_t bytes = static_cast<std::size_t>(m_info->size) * static_cast<std::size_t>(m_info->itemsize);
+    if (bytes % sizeof(T) != 0) {
+        throw py::value_error(
+            "buffer size of " + std::to_string(bytes) + " bytes is not a multiple of the element size " + std::to_string(sizeof(T))
+        );
+    }
+
+    m_data = static_cast<T*>(m_info->ptr);
+    m_size = bytes / sizeof(T);
+}
+
+template <typename T, typename Scalar>
+T* BufferView<T, Scalar>::data() const {
+    return m_data;
+}
+
+template <typename T, typename Scalar>
+std::size_t BufferView<T, Scalar>::size() const {
+    return m_size;
+}
+
+template <typename T, typename Scalar>
+BufferView<T, Scalar>::operator T*() const {
+    return m_data;
+}
+
+namespace pybind11::detail {
+template <>
+struct process_attribute<reject_buffer_exports> : public process_attribute_default<reject_buffer_exports> {
+    static void precall(function_call& call) {
+        require_no_buffer_exports(call.args[0]);
+    }
+};
+}
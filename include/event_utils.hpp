@@ -0,0 +1,63 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <vector>
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+namespace sf {
+    class Event;
+    class WindowBase;
+}
+
+enum class EventType : std::int32_t {
+    Closed,
+    Resized,
+    FocusLost,
+    FocusGained,
+    TextEntered,
+    KeyPressed,
+    KeyReleased,
+    MouseWheelScrolled,
+    MouseButtonPressed,
+    MouseButtonReleased,
+    MouseMoved,
+    MouseMovedRaw,
+    MouseEntered,
+    MouseLeft,
+    JoystickButtonPressed,
+    JoystickButtonReleased,
+    JoystickMoved,
+    JoystickConnected,
+    JoystickDisconnected,
+    TouchBegan,
+    TouchMoved,
+    TouchEnded,
+    SensorChanged,
+};
+
+struct EventRecord {
+    std::int32_t type;
+    std::int32_t code;
+    std::int32_t scancode;
+    std::uint32_t modifiers;
+    std::int32_t x;
+    std::int32_t y;
+    float value[3];
+};
+
+class EventBuffer {
+public:
+    std::vector<EventRecord> records;
+};
+
+const std::string& event_buffer_format();
+
+EventRecord event_record(const sf::Event& event);
+
+EventBuffer poll_events(sf::WindowBase& window, std::size_t maxEvents);
+
+void bind_event_buffer(py::module& m, py::handle eventClass);
@@ -0,0 +1,34 @@
+#pragma once
+
+#include "SFML/System/InputStream.hpp"
+#include <cstddef>
+#include <cstdint>
+#include <optional>
+#include <string>
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+namespace sf {
+    class MemoryInputStream;
+}
+
+class MappedFileInputStream : public sf::InputStream {
+public:
+    MappedFileInputStream(const std::string& filename, std::size_t offset, std::optional<std::size_t> length);
+
+    std::optional<std::size_t> read(void* data, std::size_t size) override;
+    std::optional<std::size_t> seek(std::size_t position) override;
+    std::optional<std::size_t> tell() override;
+    std::optional<std::size_t> getSize() override;
+
+private:
+    py::buffer_info m_mapping;
+    const std::uint8_t* m_data = nullptr;
+    std::size_t m_size = 0;
+    std::size_t m_position = 0;
+};
+
+sf::MemoryInputStream memory_input_stream_from_buffer(const py::buffer& data, std::size_t offset, std::optional<std::size_t> length);
+
+void bind_mapped_file_input_stream(py::module& m);
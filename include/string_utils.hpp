@@ -1,6 +1,6 @@
 #pragma once
 
-#include "SFML/System.hpp"
+#include "SFML/System/String.hpp"
 #include <vector>
 #include <string>
 #include <pybind11/pybind11.h>
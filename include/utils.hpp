@@ -1,17 +1,24 @@
 #pragma once
 
-#include "SFML/System.hpp"
-#include "SFML/Window.hpp"
-#include "SFML/Graphics.hpp"
-#include "SFML/Audio.hpp"
-#include "SFML/Network.hpp"
+#include "SFML/System/Vector2.hpp"
+#include "SFML/System/Vector3.hpp"
+#include "SFML/Window/WindowHandle.hpp"
 #include "string_utils.hpp"
 #include "wrap_utils.hpp"
+#include "audio_utils.hpp"
+#include "buffer_utils.hpp"
+#include "batch_utils.hpp"
+#include "event_utils.hpp"
+#include "stream_utils.hpp"
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <cstddef>
 #include <cstdint>
 #include <functional>
+#include <memory>
+#include <optional>
+#include <sstream>
+#include <string>
 #include <vector>
 #include <filesystem>
 
@@ -41,6 +48,14 @@ private:
     sf::WindowHandle nativeHandle;
 };
 
+void parallel_for(std::size_t count, unsigned int workers, const std::function<void(std::size_t)>& task);
+
+void replace_keep_alive_impl(py::handle nurse, py::handle patient);
+
+// Like py::keep_alive, but the nurse keeps a single patient: each call replaces the one kept by the previous call.
+template <std::size_t Nurse, std::size_t Patient>
+struct replace_keep_alive {};
+
 template <typename T>
 void add_copy_support(py::class_<T>& cls);
 
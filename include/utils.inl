@@ -14,3 +14,20 @@ void hash_combine(std::size_t& seed, const T& val) {
     std::hash<T> hasher;
     seed ^= hasher(val) + 0x9e3779b9 + (seed << 6) + (seed >> 2);
 }
+
+namespace pybind11::detail {
+template <std::size_t Nurse, std::size_t Patient>
+struct process_attribute<replace_keep_alive<Nurse, Patient>> : public process_attribute_default<replace_keep_alive<Nurse, Patient>> {
+    static_assert(Nurse != 0 && Patient != 0, "replace_keep_alive only applies to arguments");
+
+    static void precall(function_call& call) {
+        const auto argument = [&call](std::size_t index) -> handle {
+            if (index == 1 && call.init_self) {
+                return call.init_self;
+            }
+            return index <= call.args.size() ? call.args[index - 1] : handle();
+        };
+        replace_keep_alive_impl(argument(Nurse), argument(Patient));
+    }
+};
+}
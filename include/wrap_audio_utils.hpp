@@ -0,0 +1,57 @@
+#pragma once
+
+#include "SFML/Audio/PlaybackDevice.hpp"
+#include "audio_utils.hpp"
+#include "wrap_utils.hpp"
+
+namespace detail {
+    inline void release_frame_memoryview(const py::memoryview& memory, AudioFrameView* view) {
+        // A memoryview still exported (e.g. to an array) cannot be released, the frames are dropped either way.
+        try {
+            memory.attr("release")();
+        } catch (const py::error_already_set&) {
+        }
+        view->release();
+    }
+
+    template <>
+    inline std::function<void(const float*, unsigned int&, float*, unsigned int&, unsigned int)>
+    wrap_impl(py::function func)
+    {
+        // The exporters are created once and pointed at the frames of each call, the processor gets plain memoryviews over them.
+        py::object input = py::cast(AudioFrameView(true));
+        py::object output = py::cast(AudioFrameView(false));
+        AudioFrameView* inputView = input.cast<AudioFrameView*>();
+        AudioFrameView* outputView = output.cast<AudioFrameView*>();
+        return [func = std::move(func), input = std::move(input), output = std::move(output), inputView, outputView](const float* inputFrames, unsigned int& inputFrameCount,
+                    float* outputFrames, unsigned int& outputFrameCount,
+                    unsigned int frameChannelCount)
+        {
+            py::gil_scoped_acquire gil;
+            inputView->reset(const_cast<float*>(inputFrames), inputFrameCount, frameChannelCount);
+            outputView->reset(outputFrames, outputFrameCount, frameChannelCount);
+            py::memoryview inputMemory(input);
+            py::memoryview outputMemory(output);
+            try {
+                func(inputMemory, inputFrameCount, outputMemory, outputFrameCount, frameChannelCount);
+            } catch (...) {
+                release_frame_memoryview(inputMemory, inputView);
+                release_frame_memoryview(outputMemory, outputView);
+                throw;
+            }
+            release_frame_memoryview(inputMemory, inputView);
+            release_frame_memoryview(outputMemory, outputView);
+        };
+    }
+
+    template <>
+    inline std::function<void(sf::PlaybackDevice::Notification)>
+    wrap_impl(py::function func)
+    {
+        return [func = std::move(func)](sf::PlaybackDevice::Notification notification)
+        {
+            py::gil_scoped_acquire gil;
+            func(notification);
+        };
+    }
+}
@@ -0,0 +1,18 @@
+#pragma once
+
+#include "SFML/Graphics/Color.hpp"
+#include "SFML/Graphics/Text.hpp"
+#include "wrap_utils.hpp"
+
+namespace detail {
+    template <>
+    inline std::function<void(const sf::Text::ShapedGlyph&, std::uint32_t&, sf::Color&, sf::Color&, float&)>
+    wrap_impl(py::function func)
+    {
+        return [func = std::move(func)](const sf::Text::ShapedGlyph& shapedGlyph, std::uint32_t& style, sf::Color& fillColor, sf::Color& outlineColor, float& outlineThickness)
+        {
+            py::gil_scoped_acquire gil;
+            func(shapedGlyph, style, fillColor, outlineColor, outlineThickness);
+        };
+    }
+}
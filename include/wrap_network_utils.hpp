@@ -0,0 +1,17 @@
+#pragma once
+
+#include "SFML/Network/SocketSelector.hpp"
+#include "wrap_utils.hpp"
+
+namespace detail {
+    template <>
+    inline std::function<void(sf::SocketSelector::ReadinessType)>
+    wrap_impl(py::function func)
+    {
+        return [func = std::move(func)](sf::SocketSelector::ReadinessType readiness)
+        {
+            py::gil_scoped_acquire gil;
+            func(readiness);
+        };
+    }
+}
@@ -1,10 +1,5 @@
 #pragma once
 
-#include "SFML/System.hpp"
-#include "SFML/Window.hpp"
-#include "SFML/Graphics.hpp"
-#include "SFML/Audio.hpp"
-#include "SFML/Network.hpp"
 #include <functional>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
@@ -20,18 +15,6 @@ namespace detail {
     template <typename Signature>
     inline std::function<Signature> wrap_impl(py::function func);
 
-    template <>
-    inline std::function<void(const float*, unsigned int&, float*, unsigned int&, unsigned int)>
-    wrap_impl(py::function func);
-
-    template <>
-    inline std::function<void(sf::PlaybackDevice::Notification)>
-    wrap_impl(py::function func);
-
-    template <>
-    inline std::function<void(const sf::Text::ShapedGlyph&, std::uint32_t&, sf::Color&, sf::Color&, float&)>
-    wrap_impl(py::function func);
-
     template <>
     inline std::function<bool(const void*, std::size_t)>
     wrap_impl(py::function func);
@@ -40,10 +23,6 @@ namespace detail {
     inline std::function<bool(void*, std::size_t&)>
     wrap_impl(py::function func);
 
-    template <>
-    inline std::function<void(sf::SocketSelector::ReadinessType)>
-    wrap_impl(py::function func);
-
     template <>
     inline std::function<bool()>
     wrap_impl(py::function func);
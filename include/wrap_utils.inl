@@ -9,55 +9,6 @@ namespace detail {
         return nullptr;
     }
 
-    template <>
-    std::function<void(const float*, unsigned int&, float*, unsigned int&, unsigned int)>
-    wrap_impl(py::function func)
-    {
-        return [func = std::move(func)](const float* inputFrames, unsigned int& inputFrameCount,
-                    float* outputFrames, unsigned int& outputFrameCount,
-                    unsigned int frameChannelCount)
-        {
-            py::gil_scoped_acquire gil;
-            auto input = py::memoryview::from_buffer(
-                const_cast<float*>(inputFrames),
-                sizeof(float),
-                py::format_descriptor<float>::format().c_str(),
-                {inputFrameCount, frameChannelCount},
-                {sizeof(float) * frameChannelCount, sizeof(float)}
-            );
-            auto output = py::memoryview::from_buffer(
-                outputFrames,
-                sizeof(float),
-                py::format_descriptor<float>::format().c_str(),
-                {outputFrameCount, frameChannelCount},
-                {sizeof(float) * frameChannelCount, sizeof(float)}
-            );
-            func(input, inputFrameCount, output, outputFrameCount, frameChannelCount);
-        };
-    }
-
-    template <>
-    std::function<void(sf::PlaybackDevice::Notification)>
-    wrap_impl(py::function func)
-    {
-        return [func = std::move(func)](sf::PlaybackDevice::Notification notification)
-        {
-            py::gil_scoped_acquire gil;
-            func(notification);
-        };
-    }
-
-    template <>
-    std::function<void(const sf::Text::ShapedGlyph&, std::uint32_t&, sf::Color&, sf::Color&, float&)>
-    wrap_impl(py::function func)
-    {
-        return [func = std::move(func)](const sf::Text::ShapedGlyph& shapedGlyph, std::uint32_t& style, sf::Color& fillColor, sf::Color& outlineColor, float& outlineThickness)
-        {
-            py::gil_scoped_acquire gil;
-            func(shapedGlyph, style, fillColor, outlineColor, outlineThickness);
-        };
-    }
-
     template <>
     std::function<bool(const void*, std::size_t)>
     wrap_impl(py::function func)
@@ -94,17 +45,6 @@ namespace detail {
         };
     }
 
-    template <>
-    std::function<void(sf::SocketSelector::ReadinessType)>
-    wrap_impl(py::function func)
-    {
-        return [func = std::move(func)](sf::SocketSelector::ReadinessType readiness)
-        {
-            py::gil_scoped_acquire gil;
-            func(readiness);
-        };
-    }
-
     template <>
     std::function<bool()>
     wrap_impl(py::function func)
@@ -1,7 +1,9 @@
 import os
 import sys
 import shutil
+import argparse
 from pathlib import Path
+from contextlib import nullcontext
 from clang import cindex
 import PybindGen
 
@@ -23,10 +25,10 @@ def readVersionsConfig(configPath="versions.conf"):
 
 versions_config = readVersionsConfig()
 hpp_root = "SFML/include"
-includes = "-ISFML/include"
 repo_root = "SFML"
 parse_folders = ["Audio", "Graphics", "Network", "System", "Window"]
 output_folder = "output"
+parse_cache_folder = ".pysf_cache"
 cpp_version = "c++20"
 python_version = os.environ.get("PYTHON_VERSION") or versions_config.get("PYTHON_VERSION")
 if not python_version:
@@ -47,19 +49,19 @@ SPECIFIC_TYPE = {
     "std::vector<sf::String>": ["std::vector<std::string>", "toVectorUTF8String(DATA)"],
     "sf::String": ["std::string", "toSFString(DATA)"],
     "String": ["std::string", "toSFString(DATA)"],
-    "void*": ["py::buffer", "static_cast<std::uint8_t*>(DATA.request().ptr)"],
-    "short*": ["std::vector<short>&", "DATA.data()"],
-    "int*": ["std::vector<int>&", "DATA.data()"],
-    "float*": ["std::vector<float>&", "DATA.data()"],
-    "std::int16_t*": ["std::vector<std::int16_t>&", "DATA.data()"],
-    "std::uint8_t*": ["std::vector<std::uint8_t>&", "DATA.data()"],
-    "sf::Vector2<float>*": ["std::vector<sf::Vector2<float>>&", "DATA.data()"],
-    "sf::Vector3<float>*": ["std::vector<sf::Vector3<float>>&", "DATA.data()"],
-    "sf::priv::Vector4<float>*": ["std::vector<sf::priv::Vector4<float>>&", "DATA.data()"],
-    "sf::priv::Matrix<3, 3>*": ["std::vector<sf::priv::Matrix<3, 3>>&", "DATA.data()"],
-    "sf::priv::Matrix<4, 4>*": ["std::vector<sf::priv::Matrix<4, 4>>&", "DATA.data()"],
-    "sf::Vertex*": ["std::vector<sf::Vertex>&", "DATA.data()"],
-    "unsigned char*": ["std::vector<std::uint8_t>&", "DATA.data()"],
+    "void*": ["py::object", "RawBufferView(DATA, WRITABLE)"],
+    "short*": ["py::object", "BufferView<short>(DATA, WRITABLE)"],
+    "int*": ["py::object", "BufferView<int>(DATA, WRITABLE)"],
+    "float*": ["py::object", "BufferView<float>(DATA, WRITABLE)"],
+    "std::int16_t*": ["py::object", "BufferView<std::int16_t>(DATA, WRITABLE)"],
+    "std::uint8_t*": ["py::object", "BufferView<std::uint8_t>(DATA, WRITABLE)"],
+    "sf::Vector2<float>*": ["py::object", "BufferView<sf::Vector2<float>, float>(DATA, WRITABLE)"],
+    "sf::Vector3<float>*": ["py::object", "BufferView<sf::Vector3<float>, float>(DATA, WRITABLE)"],
+    "sf::priv::Vector4<float>*": ["py::object", "BufferView<sf::priv::Vector4<float>, float>(DATA, WRITABLE)"],
+    "sf::priv::Matrix<3, 3>*": ["py::object", "BufferView<sf::priv::Matrix<3, 3>, float>(DATA, WRITABLE)"],
+    "sf::priv::Matrix<4, 4>*": ["py::object", "BufferView<sf::priv::Matrix<4, 4>, float>(DATA, WRITABLE)"],
+    "sf::Vertex*": ["py::object", "BufferView<sf::Vertex, std::uint8_t>(DATA, WRITABLE)"],
+    "unsigned char*": ["py::object", "BufferView<std::uint8_t>(DATA, WRITABLE)"],
     "char*": ["std::string&", "DATA.data()"],
     "wchar_t*": ["std::wstring&", "DATA.data()"],
     "sf::WindowHandle": ["WindowHandle", "DATA"],
@@ -107,21 +109,19 @@ SPECIAL_REPLACE = {
     (
         "v_sfTransform",
         '"getMatrix"',
-    ): '{}v_sfTransform.def("getMatrix", [](sf::Transform& self) {{ const float* m = self.getMatrix(); return std::vector<float>(m, m + 16); }},"{}");'.format(
+    ): '{}v_sfTransform.def("getMatrix", [](sf::Transform& self) {{ return transform_matrix_view(self); }},"{}");'.format(
         TAB_STR,
         "\\n".join(
             [
                 "\\\\brief Return the transform as a 4x4 matrix",
                 "",
-                "This function returns a pointer to an array of 16 floats",
-                "containing the transform elements as a 4x4 matrix, which",
-                "is directly compatible with OpenGL functions.",
-                "\\\\code",
-                "sf::Transform transform = ...;",
-                "glLoadMatrixf(transform.getMatrix());",
-                "\\\\endcode",
+                "This function returns the transform elements as a 4x4",
+                "matrix, which is directly compatible with OpenGL functions.",
+                "The elements are copied into a 4x4 float32 memoryview in",
+                "OpenGL column-major order, so each row of the view holds",
+                "one column of the matrix.",
                 "",
-                "\\\\return Pointer to a 4x4 matri",
+                "\\\\return 4x4 matrix of the transform",
             ]
         ),
     ),
@@ -145,6 +145,26 @@ SPECIAL_REPLACE = {
             ]
         ),
     ),
+    (
+        "v_sfSoundBuffer",
+        '"getSamples"',
+    ): '{}v_sfSoundBuffer.def("getSamples", [](py::object self) {{ return py::memoryview(self); }}, "{}");'.format(
+        TAB_STR,
+        "\\n".join(
+            [
+                "\\\\brief Get a read-only view of the audio samples stored in the buffer",
+                "",
+                "The format of the returned samples is 16 bit signed integer.",
+                "The total number of samples in this array is given by the",
+                "getSampleCount() function. The samples are not copied: the",
+                "view keeps the sound buffer alive, but it becomes invalid if",
+                "the buffer is loaded again, so you should request a new view",
+                "after loading.",
+                "",
+                "\\\\return Int16 memoryview over the samples",
+            ]
+        ),
+    ),
     (
         "v_sfShader",
         "py::init<std::string, sf::Shader::Type>()",
@@ -163,13 +183,148 @@ SPECIAL_REPLACE = {
     ): f"{TAB_STR}// Pass std::string data to sf::Packet.__rshift__",
 }
 READWRITE_IGNORE = {"sf::SoundStream::Chunk": ["samples"]}
+BUFFER_PROTOCOL = ["sf::Image", "sf::SoundBuffer", "sf::VertexArray"]
+GIL_RELEASE = {
+    "sf": ["sleep"],
+    "sf::IpAddress": ["getPublicAddress"],
+    "sf::TcpSocket": ["connect", "send", "receive"],
+    "sf::UdpSocket": ["send", "receive"],
+    "sf::TcpListener": ["listen", "accept"],
+    "sf::SocketSelector": ["wait"],
+    "sf::Http": ["sendRequest"],
+    "sf::Ftp": [
+        "connect",
+        "disconnect",
+        "login",
+        "keepAlive",
+        "getWorkingDirectory",
+        "getDirectoryListing",
+        "changeDirectory",
+        "parentDirectory",
+        "createDirectory",
+        "deleteDirectory",
+        "renameFile",
+        "deleteFile",
+        "download",
+        "upload",
+        "sendCommand",
+    ],
+    "sf::WindowBase": ["waitEvent"],
+    "sf::Image": ["loadFromFile", "loadFromMemory", "loadFromStream", "saveToFile", "saveToMemory"],
+    "sf::Texture": ["loadFromFile", "loadFromMemory", "loadFromStream"],
+    "sf::Font": ["openFromFile", "openFromMemory", "openFromStream"],
+    "sf::SoundBuffer": ["loadFromFile", "loadFromMemory", "loadFromStream", "saveToFile"],
+    "sf::InputSoundFile": ["openFromFile", "openFromMemory", "openFromStream"],
+    "sf::Music": ["openFromFile", "openFromMemory", "openFromStream"],
+}
+LIFETIME_POLICY = {
+    "sf::Font": {
+        "openFromMemory": "replace_keep_alive<1, 2>()",
+        "openFromStream": "replace_keep_alive<1, 2>()",
+    },
+    "sf::Music": {
+        "openFromMemory": "replace_keep_alive<1, 2>()",
+        "openFromStream": "replace_keep_alive<1, 2>()",
+    },
+    "sf::InputSoundFile": {
+        "openFromMemory": "replace_keep_alive<1, 2>()",
+        "openFromStream": "replace_keep_alive<1, 2>()",
+    },
+    "sf::MemoryInputStream": {"__init__": "py::keep_alive<1, 2>()"},
+    "sf::Sound": {
+        "__init__": "replace_keep_alive<1, 2>()",
+        "setBuffer": "replace_keep_alive<1, 2>()",
+    },
+    "sf::Sprite": {
+        "__init__": "replace_keep_alive<1, 2>()",
+        "setTexture": "replace_keep_alive<1, 2>()",
+    },
+    "sf::Text": {
+        "__init__": "replace_keep_alive<1, 2>()",
+        "setFont": "replace_keep_alive<1, 2>()",
+    },
+    "sf::Shape": {"setTexture": "replace_keep_alive<1, 2>()"},
+    "sf::Image": {
+        "resize": "reject_buffer_exports()",
+        "loadFromFile": "reject_buffer_exports()",
+        "loadFromMemory": "reject_buffer_exports()",
+        "loadFromStream": "reject_buffer_exports()",
+    },
+    "sf::SoundBuffer": {
+        "loadFromFile": "reject_buffer_exports()",
+        "loadFromMemory": "reject_buffer_exports()",
+        "loadFromStream": "reject_buffer_exports()",
+        "loadFromSamples": "reject_buffer_exports()",
+    },
+    "sf::VertexArray": {
+        "clear": "reject_buffer_exports()",
+        "resize": "reject_buffer_exports()",
+        "append": "reject_buffer_exports()",
+    },
+}
+BUFFER_LENGTH = {
+    "sf::InputSoundFile": {
+        "__init__": [("data", "sizeInBytes")],
+        "openFromMemory": [("data", "sizeInBytes")],
+        "read": [("samples", "maxCount")],
+    },
+    "sf::OutputSoundFile": {"write": [("samples", "count")]},
+    "sf::SoundBuffer": {
+        "__init__": [("data", "sizeInBytes"), ("samples", "sampleCount")],
+        "loadFromMemory": [("data", "sizeInBytes")],
+        "loadFromSamples": [("samples", "sampleCount")],
+    },
+    "sf::Music": {
+        "__init__": [("data", "sizeInBytes")],
+        "openFromMemory": [("data", "sizeInBytes")],
+    },
+    "sf::Font": {
+        "__init__": [("data", "sizeInBytes")],
+        "openFromMemory": [("data", "sizeInBytes")],
+    },
+    "sf::Image": {
+        "__init__": [("data", "size"), ("pixels", "std::uint64_t{size.x} * size.y * 4")],
+        "loadFromMemory": [("data", "size")],
+        "resize": [("pixels", "std::uint64_t{size.x} * size.y * 4")],
+    },
+    "sf::Texture": {
+        "__init__": [("data", "size")],
+        "loadFromMemory": [("data", "size")],
+        "update": [
+            ("pixels", "std::uint64_t{size.x} * size.y * 4"),
+            ("pixels", "std::uint64_t{self.getSize().x} * self.getSize().y * 4"),
+        ],
+    },
+    "sf::Shader": {
+        "setUniformArray": [("scalarArray", "length"), ("vectorArray", "length"), ("matrixArray", "length")],
+    },
+    "sf::VertexBuffer": {"update": [("vertices", "vertexCount"), ("vertices", "self.getVertexCount()")]},
+    "sf::RenderTarget": {"draw": [("vertices", "vertexCount")]},
+    "sf::Cursor": {
+        "__init__": [("pixels", "std::uint64_t{size.x} * size.y * 4")],
+        "createFromPixels": [("pixels", "std::uint64_t{size.x} * size.y * 4")],
+    },
+    "sf::WindowBase": {"setIcon": [("pixels", "std::uint64_t{size.x} * size.y * 4")]},
+    "sf::MemoryInputStream": {"__init__": [("data", "sizeInBytes")]},
+    "sf::Packet": {"append": [("data", "sizeInBytes")]},
+    "sf::TcpSocket": {"send": [("data", "size")], "receive": [("data", "size")]},
+    "sf::UdpSocket": {"send": [("data", "size")], "receive": [("data", "size")]},
+}
 
 SELF_INCLUDE_FILES = [
     "./include/string_utils.hpp",
+    "./include/audio_utils.hpp",
     "./include/wrap_utils.hpp",
+    "./include/buffer_utils.hpp",
+    "./include/batch_utils.hpp",
+    "./include/event_utils.hpp",
+    "./include/stream_utils.hpp",
     "./include/utils.hpp",
     "./include/bind_Vector.hpp",
+    "./include/bind_VectorArray.hpp",
     "./include/bind_Rect.hpp",
+    "./include/bind_SpatialGrid.hpp",
+    "./include/bind_Assets.hpp",
     "./include/bind_Matrix.hpp",
     "./include/bind_Handle.hpp",
     "./include/bind_Drawable.hpp",
@@ -211,78 +366,194 @@ hpp_excludes = {
 }
 
 
+def parse_arguments():
+    arg_parser = argparse.ArgumentParser(description="Generate pybind11 bindings for the SFML headers.")
+    arg_parser.add_argument(
+        "--cache-dir",
+        default=parse_cache_folder,
+        help="Directory of the on-disk cache of parsed headers (default: %(default)s)",
+    )
+    arg_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse every header with libclang instead of reusing cached results",
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to parse headers and generate bindings (default: %(default)s)",
+    )
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep the existing output tree, rewrite only files whose content changed and delete stale bindings",
+    )
+    arg_parser.add_argument(
+        "--no-pch",
+        action="store_true",
+        help="Generate a CMakeLists.txt that does not precompile utils.hpp and wrap_utils.hpp",
+    )
+    arg_parser.add_argument(
+        "--unity",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Compile the generated bindings as N size-balanced unity translation units (default: off)",
+    )
+    return arg_parser.parse_args()
+
+
 if __name__ == "__main__":
+    arguments = parse_arguments()
     project_root = os.path.abspath(".")
-    hpp_folders = PybindGen.scan_hpp_files(hpp_root, repo_root, parse_folders)
-    shutil.rmtree(output_folder, ignore_errors=True)
+    parse_cache = None if arguments.no_cache else PybindGen.ParseCache(arguments.cache_dir)
+    tu_provider = PybindGen.TranslationUnitProvider(
+        PybindGen.get_clang_args([os.path.join(project_root, hpp_root)], cpp_version, ignored_macros)
+    )
+    executor = None
+    if arguments.jobs > 1:
+        generator_config = (
+            REPLACE_TYPE,
+            SPECIFIC_TYPE,
+            IGNORE_TYPE,
+            IGNORE_RETURN_TYPE,
+            SPECIFIC_RETURN_TYPE,
+            REPLACE_DEFAULT,
+            IGNORED_MODULE,
+            SPECIAL_REPLACE,
+            READWRITE_IGNORE,
+            BUFFER_PROTOCOL,
+            GIL_RELEASE,
+            LIFETIME_POLICY,
+            BUFFER_LENGTH,
+        )
+        executor = PybindGen.ShardedExecutor(
+            arguments.jobs,
+            PybindGen.init_worker,
+            (tu_provider.clang_args, None if arguments.no_cache else arguments.cache_dir, generator_config),
+        )
+        print(f"Generating bindings with {arguments.jobs} worker processes.")
+    with executor or nullcontext():
+        binding_futures = []
+        generated_files = {}
+        hpp_folders = PybindGen.scan_hpp_files(hpp_root, repo_root, parse_folders)
+        if not arguments.incremental:
+            shutil.rmtree(output_folder, ignore_errors=True)
+        for folder, hpp_files in hpp_folders.items():
+            output_hpp = os.path.join(project_root, output_folder, "include", folder)
+            output_cpp = os.path.join(project_root, output_folder, "src", folder)
+            generated_files[output_hpp] = []
+            generated_files[output_cpp] = []
+            if not os.path.exists(output_cpp):
+                os.makedirs(output_cpp)
+            if not os.path.exists(output_hpp):
+                os.makedirs(output_hpp)
+            for hpp_file in hpp_files:
+                if hpp_file in hpp_excludes.get(folder, []):
+                    print(f"Skipping {hpp_file}")
+                    continue
+                print(f"Processing {hpp_file}")
+                read_file = os.path.join(project_root, hpp_root, repo_root, folder, hpp_file)
+                output_file = os.path.join(project_root, output_cpp, f"bind_{hpp_file.split('.')[0]}.cpp")
+                generated_files[output_cpp].append(output_file)
+                generated_files[output_hpp].append(os.path.join(project_root, output_hpp, f"bind_{hpp_file}"))
+                if executor is not None:
+                    binding_futures.append(
+                        executor.submit(
+                            read_file,
+                            PybindGen.generate_binding_job,
+                            common_module_name,
+                            hpp_root,
+                            read_file,
+                            output_file,
+                        )
+                    )
+                else:
+                    PybindGen.generate_binding_from_hpp(
+                        common_module_name,
+                        hpp_root,
+                        read_file,
+                        output_file,
+                        tu_provider,
+                        REPLACE_TYPE,
+                        SPECIFIC_TYPE,
+                        IGNORE_TYPE,
+                        IGNORE_RETURN_TYPE,
+                        SPECIFIC_RETURN_TYPE,
+                        REPLACE_DEFAULT,
+                        IGNORED_MODULE,
+                        SPECIAL_REPLACE,
+                        READWRITE_IGNORE,
+                        BUFFER_PROTOCOL,
+                        GIL_RELEASE,
+                        LIFETIME_POLICY,
+                        BUFFER_LENGTH,
+                        parse_cache,
+                    )
+
+        for future in binding_futures:
+            output_file, logs, hits, misses = future.result()
+            PybindGen.replay_logs(logs)
+            if parse_cache is not None:
+                parse_cache.hits += hits
+                parse_cache.misses += misses
+
+        if parse_cache is not None:
+            print(f"Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses")
+
+        if arguments.incremental:
+            for folder, expected_files in generated_files.items():
+                for stale_file in PybindGen.remove_stale_files(folder, r"bind_.*\.(cpp|hpp)", expected_files):
+                    print(f"Removed stale {stale_file}")
+
+        headers_to_sort = []
+        for folder, hpp_files in hpp_folders.items():
+            for hpp_file in hpp_files:
+                if hpp_file in hpp_excludes.get(folder, []):
+                    print(f"Skipping {hpp_file}")
+                    continue
+
+                headers_to_sort.append(os.path.join(project_root, hpp_root, repo_root, folder, hpp_file))
+
+        if not headers_to_sort:
+            print("No header files found to sort. Exiting.")
+            sys.exit(0)
+
+        print(f"Found {len(headers_to_sort)} header files to sort.")
+        try:
+            sorter = PybindGen.Sorter(headers_to_sort, tu_provider, parse_cache)
+            sorter.build_graph(executor)
+            if executor is None:
+                if parse_cache is not None:
+                    print(f"Sorter cache: {parse_cache.sorter_hits} hits, {parse_cache.sorter_misses} misses")
+                print(f"Parsed {tu_provider.parse_count} translation units with libclang.")
+            for node, deps in sorter.dependency_graph.items():
+                if deps:
+                    print(f"  {os.path.basename(node)} -> {[os.path.basename(d) for d in deps]}")
+            sorted_files = sorter.sort()
+
+        except (RuntimeError, cindex.LibclangError) as e:
+            print(f"\nAn error occurred: {e}", file=sys.stderr)
+            sys.exit(1)
+        except Exception as e:
+            print(f"\nAn unexpected error occurred: {e}", file=sys.stderr)
+            sys.exit(1)
+
     for folder, hpp_files in hpp_folders.items():
         output_hpp = os.path.join(project_root, output_folder, "include", folder)
-        output_cpp = os.path.join(project_root, output_folder, "src", folder)
-        if not os.path.exists(output_cpp):
-            os.makedirs(output_cpp)
-        if not os.path.exists(output_hpp):
-            os.makedirs(output_hpp)
         for hpp_file in hpp_files:
             if hpp_file in hpp_excludes.get(folder, []):
-                print(f"Skipping {hpp_file}")
                 continue
-            print(f"Processing {hpp_file}")
             read_file = os.path.join(project_root, hpp_root, repo_root, folder, hpp_file)
-            output_file = os.path.join(project_root, output_cpp, f"bind_{hpp_file.split('.')[0]}.cpp")
-            PybindGen.generate_binding_from_hpp(
-                common_module_name,
-                hpp_root,
-                read_file,
-                output_file,
-                includes,
-                cpp_version,
-                ignored_macros,
-                REPLACE_TYPE,
-                SPECIFIC_TYPE,
-                IGNORE_TYPE,
-                IGNORE_RETURN_TYPE,
-                SPECIFIC_RETURN_TYPE,
-                REPLACE_DEFAULT,
-                IGNORED_MODULE,
-                SPECIAL_REPLACE,
-                READWRITE_IGNORE,
-            )
             PybindGen.generate_hpp_file_from_hpp(
                 read_file,
                 hpp_file,
                 os.path.join(project_root, output_hpp, f"bind_{hpp_file}"),
+                sorter.get_binding_includes(read_file, PybindGen.get_addition_type_names(read_file)),
             )
 
-    headers_to_sort = []
-    project_include_paths = [os.path.join(project_root, hpp_root)]
-    for folder, hpp_files in hpp_folders.items():
-        for hpp_file in hpp_files:
-            if hpp_file in hpp_excludes.get(folder, []):
-                print(f"Skipping {hpp_file}")
-                continue
-
-            headers_to_sort.append(os.path.join(project_root, hpp_root, repo_root, folder, hpp_file))
-
-    if not headers_to_sort:
-        print("No header files found to sort. Exiting.")
-        sys.exit(0)
-
-    print(f"Found {len(headers_to_sort)} header files to sort.")
-    try:
-        sorter = PybindGen.Sorter(headers_to_sort, project_include_paths, cpp_version)
-        sorter.build_graph()
-        for node, deps in sorter.dependency_graph.items():
-            if deps:
-                print(f"  {os.path.basename(node)} -> {[os.path.basename(d) for d in deps]}")
-        sorted_files = sorter.sort()
-
-    except (RuntimeError, cindex.LibclangError) as e:
-        print(f"\nAn error occurred: {e}", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"\nAn unexpected error occurred: {e}", file=sys.stderr)
-        sys.exit(1)
-
     to_write_files = []
     for file in SELF_INCLUDE_FILES:
         file_name = Path(file).name
@@ -305,8 +576,26 @@ if __name__ == "__main__":
 
     to_write_files.remove("bind_Vector.hpp")
     to_write_files.insert(to_write_files.index("System/bind_Angle.hpp") + 1, "bind_Vector.hpp")
+    to_write_files.remove("bind_VectorArray.hpp")
+    to_write_files.insert(to_write_files.index("bind_Vector.hpp") + 1, "bind_VectorArray.hpp")
     PybindGen.generate_pybind_main(
         to_write_files,
         os.path.join(project_root, output_folder, "main.cpp"),
     )
-    PybindGen.generate_cmakelists(to_write_files, SELF_INCLUDE_FILES, python_version)
+    unity_sources = None
+    if arguments.unity > 0:
+        unity_sources = PybindGen.generate_unity_sources(
+            to_write_files,
+            SELF_INCLUDE_FILES,
+            arguments.unity,
+            os.path.join(project_root, output_folder),
+        )
+    else:
+        shutil.rmtree(os.path.join(project_root, output_folder, "src", "unity"), ignore_errors=True)
+    PybindGen.generate_cmakelists(
+        to_write_files,
+        SELF_INCLUDE_FILES,
+        python_version,
+        use_pch=not arguments.no_pch,
+        unity_sources=unity_sources,
+    )
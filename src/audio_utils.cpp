@@ -0,0 +1,226 @@
+#include "audio_utils.hpp"
+#include "buffer_utils.hpp"
+#include "SFML/Audio/SoundChannel.hpp"
+#include "SFML/Audio/SoundStream.hpp"
+#include <algorithm>
+#include <cstddef>
+#include <mutex>
+#include <string>
+#include <utility>
+#include <vector>
+
+class RingBufferSoundStream : public sf::SoundStream {
+public:
+    RingBufferSoundStream(unsigned int channelCount, unsigned int sampleRate, std::size_t capacity, std::size_t chunkSize, std::vector<sf::SoundChannel> channelMap);
+    ~RingBufferSoundStream() override;
+
+    std::size_t push(const std::int16_t* samples, std::size_t sampleCount);
+    void clear();
+    void close();
+
+    std::size_t getCapacity() const;
+    std::size_t getQueuedFrameCount() const;
+    std::uint64_t getUnderrunCount() const;
+    std::uint64_t getDroppedFrameCount() const;
+
+protected:
+    bool onGetData(Chunk& data) override;
+    void onSeek(sf::Time timeOffset) override;
+
+private:
+    std::size_t m_frameSize;
+    std::vector<std::int16_t> m_ring;
+    std::vector<std::int16_t> m_chunk;
+    mutable std::mutex m_mutex;
+    std::size_t m_readPosition = 0;
+    std::size_t m_queued = 0;
+    bool m_closed = false;
+    std::uint64_t m_underruns = 0;
+    std::uint64_t m_droppedFrames = 0;
+};
+
+namespace {
+std::vector<sf::SoundChannel> default_channel_map(unsigned int channelCount) {
+    switch (channelCount) {
+        case 1:
+            return { sf::SoundChannel::Mono };
+        case 2:
+            return { sf::SoundChannel::FrontLeft, sf::SoundChannel::FrontRight };
+        default:
+            throw py::value_error("a channel map is required for " + std::to_string(channelCount) + " channels");
+    }
+}
+
+template <typename Scalar>
+std::size_t push_samples(RingBufferSoundStream& stream, const py::object& samples) {
+    BufferView<std::int16_t, Scalar> view(samples);
+    if (view.size() % stream.getChannelCount() != 0) {
+        throw py::value_error(
+            "sample count " + std::to_string(view.size()) + " is not a multiple of the channel count " + std::to_string(stream.getChannelCount())
+        );
+    }
+    py::gil_scoped_release release;
+    return stream.push(view.data(), view.size());
+}
+}
+
+AudioFrameView::AudioFrameView(bool readonly) : readonly(readonly) {
+}
+
+void AudioFrameView::reset(float* frames, unsigned int frameCount, unsigned int channelCount) {
+    this->frames = frames;
+    this->frameCount = static_cast<py::ssize_t>(frameCount);
+    this->channelCount = static_cast<py::ssize_t>(channelCount);
+}
+
+void AudioFrameView::release() {
+    reset(nullptr, 0, 0);
+}
+
+EffectProcessorFunction native_effect_processor(const py::object& function, std::uintptr_t userData) {
+    void* address = nullptr;
+    if (py::isinstance<py::capsule>(function)) {
+        address = py::reinterpret_borrow<py::capsule>(function).get_pointer();
+    } else if (py::isinstance<py::int_>(function)) {
+        address = reinterpret_cast<void*>(function.cast<std::uintptr_t>());
+    } else {
+        throw py::type_error("native effect processor must be a PyCapsule or an integer address, got " + std::string(py::str(py::type::of(function))));
+    }
+    if (!address) {
+        throw py::value_error("native effect processor address is null");
+    }
+
+    const auto processor = reinterpret_cast<NativeEffectProcessor>(address);
+    void* data = reinterpret_cast<void*>(userData);
+    return [processor, data](const float* inputFrames, unsigned int& inputFrameCount, float* outputFrames, unsigned int& outputFrameCount, unsigned int frameChannelCount) {
+        processor(inputFrames, &inputFrameCount, outputFrames, &outputFrameCount, frameChannelCount, data);
+    };
+}
+
+void bind_audio_frame_view(py::module& m) {
+    auto v_AudioFrameView = py::class_<AudioFrameView>(m, "AudioFrameView", "\\brief Frames passed to a Python effect processor\n\nA Python effect processor receives memoryviews over the same input and output\nframe views on every call, the views are only pointed at the frames of the\ncurrent call. They expose a float32 buffer of shape\n`(frameCount, channelCount)`, the input one being read-only.\n\nThe frames are only valid during the call: once the processor returns the\nmemoryviews are released, and arrays created from them must not be kept.", py::buffer_protocol());
+    v_AudioFrameView.def_buffer([](AudioFrameView& self) {
+        return py::buffer_info(
+            self.frames,
+            sizeof(float),
+            py::format_descriptor<float>::format(),
+            2,
+            { self.frameCount, self.channelCount },
+            { static_cast<py::ssize_t>(sizeof(float)) * self.channelCount, static_cast<py::ssize_t>(sizeof(float)) },
+            self.readonly
+        );
+    });
+}
+
+RingBufferSoundStream::RingBufferSoundStream(unsigned int channelCount, unsigned int sampleRate, std::size_t capacity, std::size_t chunkSize, std::vector<sf::SoundChannel> channelMap) : m_frameSize(channelCount) {
+    if (channelCount == 0 || sampleRate == 0) {
+        throw py::value_error("channelCount and sampleRate must be positive");
+    }
+    if (capacity == 0 || chunkSize == 0) {
+        throw py::value_error("capacity and chunkSize must be positive");
+    }
+    if (channelMap.empty()) {
+        channelMap = default_channel_map(channelCount);
+    }
+    if (channelMap.size() != channelCount) {
+        throw py::value_error("channelMap has " + std::to_string(channelMap.size()) + " channels, expected " + std::to_string(channelCount));
+    }
+    m_ring.resize(capacity * m_frameSize);
+    m_chunk.resize(chunkSize * m_frameSize);
+    initialize(channelCount, sampleRate, channelMap);
+}
+
+RingBufferSoundStream::~RingBufferSoundStream() {
+    // The audio thread must not call onGetData once this part of the object is gone.
+    stop();
+}
+
+std::size_t RingBufferSoundStream::push(const std::int16_t* samples, std::size_t sampleCount) {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    const std::size_t accepted = std::min(sampleCount, m_ring.size() - m_queued);
+    const std::size_t writePosition = (m_readPosition + m_queued) % m_ring.size();
+    const std::size_t first = std::min(accepted, m_ring.size() - writePosition);
+    std::copy(samples, samples + first, m_ring.begin() + writePosition);
+    std::copy(samples + first, samples + accepted, m_ring.begin());
+    m_queued += accepted;
+    m_droppedFrames += (sampleCount - accepted) / m_frameSize;
+    return accepted / m_frameSize;
+}
+
+void RingBufferSoundStream::clear() {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    m_readPosition = 0;
+    m_queued = 0;
+    m_closed = false;
+    m_underruns = 0;
+    m_droppedFrames = 0;
+}
+
+void RingBufferSoundStream::close() {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    m_closed = true;
+}
+
+std::size_t RingBufferSoundStream::getCapacity() const {
+    return m_ring.size() / m_frameSize;
+}
+
+std::size_t RingBufferSoundStream::getQueuedFrameCount() const {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    return m_queued / m_frameSize;
+}
+
+std::uint64_t RingBufferSoundStream::getUnderrunCount() const {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    return m_underruns;
+}
+
+std::uint64_t RingBufferSoundStream::getDroppedFrameCount() const {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    return m_droppedFrames;
+}
+
+bool RingBufferSoundStream::onGetData(Chunk& data) {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    if (m_closed && m_queued == 0) {
+        return false;
+    }
+
+    // An open stream always delivers a full chunk, padded with silence, so playback keeps going through underruns.
+    const std::size_t count = m_closed ? std::min(m_queued, m_chunk.size()) : m_chunk.size();
+    const std::size_t available = std::min(m_queued, count);
+    const std::size_t first = std::min(available, m_ring.size() - m_readPosition);
+    std::copy(m_ring.begin() + m_readPosition, m_ring.begin() + m_readPosition + first, m_chunk.begin());
+    std::copy(m_ring.begin(), m_ring.begin() + (available - first), m_chunk.begin() + first);
+    if (available < count) {
+        std::fill(m_chunk.begin() + available, m_chunk.begin() + count, 0);
+        ++m_underruns;
+    }
+    m_readPosition = (m_readPosition + available) % m_ring.size();
+    m_queued -= available;
+
+    data.samples = m_chunk.data();
+    data.sampleCount = count;
+    return true;
+}
+
+void RingBufferSoundStream::onSeek(sf::Time) {
+    // A live stream has no position to seek to, queued samples are kept.
+}
+
+void bind_ring_buffer_sound_stream(py::module& m) {
+    auto v_RingBufferSoundStream = py::class_<RingBufferSoundStream, sf::SoundStream>(m, "RingBufferSoundStream", "\\brief Sound stream played from samples pushed by Python\n\nThe samples are queued in a fixed-size ring buffer, and the audio thread reads\nthem without acquiring the Python GIL, so playback does not stall while\nPython code runs. `push` can be called from any thread.\n\nWhen the queue runs dry, the stream plays silence and counts an underrun.\n\nAfter `close`, it plays the remaining samples and stops.");
+    v_RingBufferSoundStream.def(py::init<unsigned int, unsigned int, std::size_t, std::size_t, std::vector<sf::SoundChannel>>(), "\\brief Create the stream\n\n\\param channelCount Number of channels\n\n\\param sampleRate   Number of frames played per second\n\n\\param capacity     Number of frames the ring buffer can hold\n\n\\param chunkSize    Number of frames handed to the audio thread per request\n\n\\param channelMap   Channel of each sample of a frame, defaults to mono or front left and right for 1 or 2 channels", py::arg("channelCount"), py::arg("sampleRate"), py::arg("capacity"), py::arg("chunkSize") = 1024, py::arg("channelMap") = std::vector<sf::SoundChannel>{});
+    v_RingBufferSoundStream.def("push", [](RingBufferSoundStream& self, py::object samples) {
+        if (PyObject_CheckBuffer(samples.ptr()) && py::reinterpret_borrow<py::buffer>(samples).request().itemsize == 1) {
+            return push_samples<std::uint8_t>(self, samples);
+        }
+        return push_samples<std::int16_t>(self, samples);
+    }, "\\brief Queue interleaved samples\n\nOnly the frames which fit in the ring buffer are queued, the others are\ndropped and counted.\n\n\\param samples C-contiguous int16 buffer, bytes-like object of native-endian int16 samples, or sequence of ints\n\n\\return Number of frames queued", py::arg("samples"));
+    v_RingBufferSoundStream.def("clear", &RingBufferSoundStream::clear, "\\brief Discard the queued samples, reopen the stream and reset the counters");
+    v_RingBufferSoundStream.def("close", &RingBufferSoundStream::close, "\\brief Stop the stream once the queued samples are played");
+    v_RingBufferSoundStream.def("getCapacity", &RingBufferSoundStream::getCapacity, "\\brief Get the number of frames the ring buffer can hold");
+    v_RingBufferSoundStream.def("getQueuedFrameCount", &RingBufferSoundStream::getQueuedFrameCount, "\\brief Get the number of frames waiting to be played");
+    v_RingBufferSoundStream.def("getUnderrunCount", &RingBufferSoundStream::getUnderrunCount, "\\brief Get the number of chunks padded with silence because the queue ran dry");
+    v_RingBufferSoundStream.def("getDroppedFrameCount", &RingBufferSoundStream::getDroppedFrameCount, "\\brief Get the number of pushed frames dropped because the ring buffer was full");
+}
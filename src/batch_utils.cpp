@@ -0,0 +1,438 @@
+#include "batch_utils.hpp"
+#include "buffer_utils.hpp"
+#include "utils.hpp"
+#include "SFML/Graphics/Image.hpp"
+#include "SFML/Graphics/Transformable.hpp"
+#include "SFML/Graphics/VertexArray.hpp"
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <cstring>
+#include <string>
+
+namespace {
+template <typename T, typename Scalar>
+BufferView<T, Scalar> values_for(const std::vector<sf::Transformable*>& transformables, const py::object& values, const char* name) {
+    BufferView<T, Scalar> view(values);
+    if (view.size() != transformables.size()) {
+        throw py::value_error(
+            std::string(name) + " must hold one value per object, got " + std::to_string(view.size()) + " for " +
+            std::to_string(transformables.size()) + " objects"
+        );
+    }
+    return view;
+}
+
+template <typename T, typename Scalar>
+BufferView<T, Scalar> optional_values(const py::object& values, std::size_t count, const char* name) {
+    BufferView<T, Scalar> view(values);
+    if (!values.is_none() && view.size() != count) {
+        throw py::value_error(
+            std::string(name) + " must hold one value per quad, got " + std::to_string(view.size()) + " for " + std::to_string(count) + " quads"
+        );
+    }
+    return view;
+}
+
+// Two triangles per quad, as SFML 3 has no quad primitive: top-left, top-right, bottom-left, bottom-left, top-right, bottom-right.
+void write_quad(sf::Vertex* vertices, const sf::Vector2f (&corners)[4], const sf::FloatRect& textureRect, sf::Color color) {
+    const sf::Vector2f texCoords[4] = {
+        textureRect.position,
+        { textureRect.position.x + textureRect.size.x, textureRect.position.y },
+        { textureRect.position.x + textureRect.size.x, textureRect.position.y + textureRect.size.y },
+        { textureRect.position.x, textureRect.position.y + textureRect.size.y },
+    };
+    constexpr int order[6] = { 0, 1, 3, 3, 1, 2 };
+    for (int i = 0; i < 6; ++i) {
+        vertices[i].position = corners[order[i]];
+        vertices[i].color = color;
+        vertices[i].texCoords = texCoords[order[i]];
+    }
+}
+
+// Skyline bottom-left packer: the top edge of the packed area is kept as a list of horizontal segments,
+// and each rectangle is placed where its bottom edge ends up the lowest.
+class SkylinePacker {
+public:
+    SkylinePacker(std::uint64_t width, std::uint64_t height) : m_width(width), m_height(height), m_nodes{ { 0, 0, width } } {
+    }
+
+    std::optional<sf::Vector2<std::uint64_t>> insert(std::uint64_t width, std::uint64_t height) {
+        std::optional<std::size_t> best;
+        std::uint64_t bestY = 0;
+        for (std::size_t i = 0; i < m_nodes.size(); ++i) {
+            const std::optional<std::uint64_t> y = fit(i, width, height);
+            if (y && (!best || *y < bestY || (*y == bestY && m_nodes[i].width < m_nodes[*best].width))) {
+                best = i;
+                bestY = *y;
+            }
+        }
+        if (!best) {
+            return std::nullopt;
+        }
+
+        const sf::Vector2<std::uint64_t> position(m_nodes[*best].x, bestY);
+        m_nodes.insert(m_nodes.begin() + static_cast<std::ptrdiff_t>(*best), { position.x, bestY + height, width });
+        for (std::size_t i = *best + 1; i < m_nodes.size();) {
+            const Node& previous = m_nodes[i - 1];
+            if (m_nodes[i].x >= previous.x + previous.width) {
+                break;
+            }
+            const std::uint64_t shrink = previous.x + previous.width - m_nodes[i].x;
+            if (m_nodes[i].width <= shrink) {
+                m_nodes.erase(m_nodes.begin() + static_cast<std::ptrdiff_t>(i));
+                continue;
+            }
+            m_nodes[i].x += shrink;
+            m_nodes[i].width -= shrink;
+            break;
+        }
+        for (std::size_t i = 1; i < m_nodes.size();) {
+            if (m_nodes[i - 1].y == m_nodes[i].y) {
+                m_nodes[i - 1].width += m_nodes[i].width;
+                m_nodes.erase(m_nodes.begin() + static_cast<std::ptrdiff_t>(i));
+            } else {
+                ++i;
+            }
+        }
+        return position;
+    }
+
+private:
+    struct Node {
+        std::uint64_t x;
+        std::uint64_t y;
+        std::uint64_t width;
+    };
+
+    std::optional<std::uint64_t> fit(std::size_t index, std::uint64_t width, std::uint64_t height) const {
+        if (m_nodes[index].x + width > m_width) {
+            return std::nullopt;
+        }
+        std::uint64_t y = 0;
+        std::uint64_t remaining = width;
+        for (std::size_t i = index; remaining > 0; ++i) {
+            y = std::max(y, m_nodes[i].y);
+            if (y + height > m_height) {
+                return std::nullopt;
+            }
+            remaining -= std::min(remaining, m_nodes[i].width);
+        }
+        return y;
+    }
+
+    std::uint64_t m_width;
+    std::uint64_t m_height;
+    std::vector<Node> m_nodes;
+};
+
+std::optional<std::vector<sf::Vector2<std::uint64_t>>> pack_rects(
+    const std::vector<sf::Vector2<std::uint64_t>>& sizes,
+    const std::vector<std::size_t>& order,
+    std::uint64_t width,
+    std::uint64_t height
+) {
+    SkylinePacker packer(width, height);
+    std::vector<sf::Vector2<std::uint64_t>> positions(sizes.size());
+    for (std::size_t index : order) {
+        const auto position = packer.insert(sizes[index].x, sizes[index].y);
+        if (!position) {
+            return std::nullopt;
+        }
+        positions[index] = *position;
+    }
+    return positions;
+}
+}
+
+std::vector<sf::Transformable*> transformable_pointers(const py::sequence& objects) {
+    std::vector<sf::Transformable*> transformables;
+    transformables.reserve(objects.size());
+    for (std::size_t i = 0; i < objects.size(); ++i) {
+        py::object object = objects[i];
+        if (!py::isinstance<sf::Transformable>(object)) {
+            throw py::type_error(
+                "objects[" + std::to_string(i) + "] must be a Transformable, got " + std::string(py::str(py::type::of(object).attr("__name__")))
+            );
+        }
+        transformables.push_back(object.cast<sf::Transformable*>());
+    }
+    return transformables;
+}
+
+void transformable_set_positions(const py::sequence& objects, const py::object& positions) {
+    const std::vector<sf::Transformable*> transformables = transformable_pointers(objects);
+    const auto view = values_for<sf::Vector2f, float>(transformables, positions, "positions");
+    for (std::size_t i = 0; i < transformables.size(); ++i) {
+        transformables[i]->setPosition(view.data()[i]);
+    }
+}
+
+void transformable_set_rotations(const py::sequence& objects, const py::object& angles) {
+    const std::vector<sf::Transformable*> transformables = transformable_pointers(objects);
+    const auto view = values_for<float, float>(transformables, angles, "angles");
+    for (std::size_t i = 0; i < transformables.size(); ++i) {
+        transformables[i]->setRotation(sf::degrees(view.data()[i]));
+    }
+}
+
+void transformable_set_scales(const py::sequence& objects, const py::object& factors) {
+    const std::vector<sf::Transformable*> transformables = transformable_pointers(objects);
+    const auto view = values_for<sf::Vector2f, float>(transformables, factors, "factors");
+    for (std::size_t i = 0; i < transformables.size(); ++i) {
+        transformables[i]->setScale(view.data()[i]);
+    }
+}
+
+void transformable_set_origins(const py::sequence& objects, const py::object& origins) {
+    const std::vector<sf::Transformable*> transformables = transformable_pointers(objects);
+    const auto view = values_for<sf::Vector2f, float>(transformables, origins, "origins");
+    for (std::size_t i = 0; i < transformables.size(); ++i) {
+        transformables[i]->setOrigin(view.data()[i]);
+    }
+}
+
+py::object transformable_get_positions(const py::sequence& objects) {
+    const std::vector<sf::Transformable*> transformables = transformable_pointers(objects);
+    float* result = nullptr;
+    py::object output = new_float_buffer(static_cast<py::ssize_t>(transformables.size()), 2, &result);
+    for (std::size_t i = 0; i < transformables.size(); ++i) {
+        const sf::Vector2f position = transformables[i]->getPosition();
+        result[i * 2] = position.x;
+        result[i * 2 + 1] = position.y;
+    }
+    return output;
+}
+
+py::object transformable_get_rotations(const py::sequence& objects) {
+    const std::vector<sf::Transformable*> transformables = transformable_pointers(objects);
+    float* result = nullptr;
+    py::object output = new_float_buffer(static_cast<py::ssize_t>(transformables.size()), &result);
+    for (std::size_t i = 0; i < transformables.size(); ++i) {
+        result[i] = transformables[i]->getRotation().asDegrees();
+    }
+    return output;
+}
+
+py::object transformable_get_scales(const py::sequence& objects) {
+    const std::vector<sf::Transformable*> transformables = transformable_pointers(objects);
+    float* result = nullptr;
+    py::object output = new_float_buffer(static_cast<py::ssize_t>(transformables.size()), 2, &result);
+    for (std::size_t i = 0; i < transformables.size(); ++i) {
+        const sf::Vector2f scale = transformables[i]->getScale();
+        result[i * 2] = scale.x;
+        result[i * 2 + 1] = scale.y;
+    }
+    return output;
+}
+
+void vertex_array_fill_quads(
+    sf::VertexArray& vertexArray,
+    const py::object& positions,
+    const py::object& sizes,
+    const py::object& textureRects,
+    const py::object& colors,
+    const py::object& rotations,
+    std::size_t first
+) {
+    BufferView<sf::Vector2f, float> positionView(positions);
+    const std::size_t count = positionView.size();
+    const auto sizeView = optional_values<sf::Vector2f, float>(sizes, count, "sizes");
+    const auto textureRectView = optional_values<sf::FloatRect, float>(textureRects, count, "textureRects");
+    const auto colorView = optional_values<sf::Color, std::uint8_t>(colors, count, "colors");
+    const auto rotationView = optional_values<float, float>(rotations, count, "rotations");
+    if (sizes.is_none() && textureRects.is_none()) {
+        throw py::value_error("sizes or textureRects must be given");
+    }
+    if (vertexArray.getVertexCount() < (first + count) * 6) {
+        require_no_buffer_exports(vertexArray);
+    }
+
+    py::gil_scoped_release release;
+    vertexArray.setPrimitiveType(sf::PrimitiveType::Triangles);
+    if (vertexArray.getVertexCount() < (first + count) * 6) {
+        vertexArray.resize((first + count) * 6);
+    }
+    for (std::size_t i = 0; i < count; ++i) {
+        const sf::Vector2f position = positionView.data()[i];
+        const sf::Vector2f size = sizes.is_none() ? textureRectView.data()[i].size : sizeView.data()[i];
+        const sf::FloatRect textureRect = textureRects.is_none() ? sf::FloatRect({ 0.f, 0.f }, size) : textureRectView.data()[i];
+        const sf::Color color = colors.is_none() ? sf::Color::White : colorView.data()[i];
+
+        sf::Vector2f corners[4] = { { 0.f, 0.f }, { size.x, 0.f }, size, { 0.f, size.y } };
+        if (!rotations.is_none() && rotationView.data()[i] != 0.f) {
+            const float radians = sf::degrees(rotationView.data()[i]).asRadians();
+            const float cos = std::cos(radians);
+            const float sin = std::sin(radians);
+            for (sf::Vector2f& corner : corners) {
+                corner = { cos * corner.x - sin * corner.y, sin * corner.x + cos * corner.y };
+            }
+        }
+        for (sf::Vector2f& corner : corners) {
+            corner += position;
+        }
+        write_quad(&vertexArray[(first + i) * 6], corners, textureRect, color);
+    }
+}
+
+void vertex_array_fill_tile_map(
+    sf::VertexArray& vertexArray,
+    const py::buffer& tiles,
+    sf::Vector2f tileSize,
+    unsigned int tilesetColumns,
+    std::optional<sf::Vector2f> textureTileSize,
+    std::optional<sf::IntRect> region
+) {
+    const py::buffer_info info = tiles.request();
+    if (info.ndim != 2) {
+        throw py::value_error("tiles must be a 2D buffer of shape (rows, columns), got " + std::to_string(info.ndim) + " dimensions");
+    }
+    if (tilesetColumns == 0) {
+        throw py::value_error("tilesetColumns must be positive");
+    }
+    const std::vector<std::int64_t> indices = read_indices(tiles);
+    const auto rows = static_cast<int>(info.shape[0]);
+    const auto columns = static_cast<int>(info.shape[1]);
+    const std::size_t quadCount = static_cast<std::size_t>(rows) * static_cast<std::size_t>(columns);
+
+    sf::IntRect area({ 0, 0 }, { columns, rows });
+    if (region) {
+        if (region->position.x < 0 || region->position.y < 0 || region->size.x < 0 || region->size.y < 0 ||
+            region->position.x + region->size.x > columns || region->position.y + region->size.y > rows) {
+            throw py::value_error("region must lie inside the tile grid");
+        }
+        if (vertexArray.getVertexCount() != quadCount * 6) {
+            throw py::value_error("the vertex array must be filled from the whole tile grid before refilling a region");
+        }
+        area = *region;
+    }
+
+    if (!region && vertexArray.getVertexCount() != quadCount * 6) {
+        require_no_buffer_exports(vertexArray);
+    }
+
+    const sf::Vector2f textureSize = textureTileSize.value_or(tileSize);
+    py::gil_scoped_release release;
+    if (!region) {
+        vertexArray.setPrimitiveType(sf::PrimitiveType::Triangles);
+        vertexArray.resize(quadCount * 6);
+    }
+    for (int row = area.position.y; row < area.position.y + area.size.y; ++row) {
+        for (int column = area.position.x; column < area.position.x + area.size.x; ++column) {
+            const std::size_t quad = static_cast<std::size_t>(row) * static_cast<std::size_t>(columns) + static_cast<std::size_t>(column);
+            const std::int64_t tile = indices[quad];
+            sf::Vertex* vertices = &vertexArray[quad * 6];
+            if (tile < 0) {
+                // Negative indices are empty tiles, drawn as degenerate triangles.
+                std::fill(vertices, vertices + 6, sf::Vertex{});
+                continue;
+            }
+
+            const sf::Vector2f position(static_cast<float>(column) * tileSize.x, static_cast<float>(row) * tileSize.y);
+            const sf::Vector2f corners[4] = {
+                position,
+                { position.x + tileSize.x, position.y },
+                position + tileSize,
+                { position.x, position.y + tileSize.y },
+            };
+            const sf::FloatRect textureRect(
+                { static_cast<float>(tile % tilesetColumns) * textureSize.x, static_cast<float>(tile / tilesetColumns) * textureSize.y },
+                textureSize
+            );
+            write_quad(vertices, corners, textureRect, sf::Color::White);
+        }
+    }
+}
+
+py::tuple image_pack_atlas(const py::sequence& images, unsigned int maxSize, unsigned int padding, unsigned int workers) {
+    std::vector<const sf::Image*> sources;
+    sources.reserve(images.size());
+    for (std::size_t i = 0; i < images.size(); ++i) {
+        py::object image = images[i];
+        if (!py::isinstance<sf::Image>(image)) {
+            throw py::type_error(
+                "images[" + std::to_string(i) + "] must be an Image, got " + std::string(py::str(py::type::of(image).attr("__name__")))
+            );
+        }
+        sources.push_back(image.cast<const sf::Image*>());
+    }
+
+    // Padding is added to the right and bottom of every image, and the bin grows by the same amount so the last
+    // row and column do not need it.
+    const std::uint64_t limit = static_cast<std::uint64_t>(maxSize) + padding;
+    std::vector<sf::Vector2<std::uint64_t>> sizes;
+    std::vector<std::size_t> order;
+    std::uint64_t area = 0;
+    std::uint64_t largest = 1;
+    for (std::size_t i = 0; i < sources.size(); ++i) {
+        const sf::Vector2u size = sources[i]->getSize();
+        sizes.emplace_back(size.x > 0 && size.y > 0 ? size.x + padding : 0, size.x > 0 && size.y > 0 ? size.y + padding : 0);
+        if (sizes[i].x == 0) {
+            continue;
+        }
+        if (sizes[i].x > limit || sizes[i].y > limit) {
+            throw py::value_error(
+                "images[" + std::to_string(i) + "] of size " + std::to_string(size.x) + "x" + std::to_string(size.y) + " does not fit in an atlas of " +
+                std::to_string(maxSize) + "x" + std::to_string(maxSize)
+            );
+        }
+        order.push_back(i);
+        area += sizes[i].x * sizes[i].y;
+        largest = std::max({ largest, sizes[i].x, sizes[i].y });
+    }
+
+    std::vector<std::uint32_t> rects(sources.size() * 4, 0);
+    sf::Vector2u atlasSize;
+    {
+        py::gil_scoped_release release;
+        std::stable_sort(order.begin(), order.end(), [&sizes](std::size_t a, std::size_t b) {
+            return sizes[a].y != sizes[b].y ? sizes[a].y > sizes[b].y : sizes[a].x > sizes[b].x;
+        });
+
+        // Start from the smallest power of two square holding the total area, and grow one side at a time.
+        std::uint64_t side = 1;
+        while (side < largest || side * side < area) {
+            side *= 2;
+        }
+        sf::Vector2<std::uint64_t> binSize(std::min(side, limit), std::min(side, limit));
+        std::optional<std::vector<sf::Vector2<std::uint64_t>>> positions;
+        while (!(positions = pack_rects(sizes, order, binSize.x, binSize.y))) {
+            if (binSize.x == limit && binSize.y == limit) {
+                py::gil_scoped_acquire acquire;
+                throw py::value_error("images do not fit in an atlas of " + std::to_string(maxSize) + "x" + std::to_string(maxSize));
+            }
+            std::uint64_t& grown = binSize.x <= binSize.y && binSize.x < limit ? binSize.x : binSize.y;
+            grown = std::min(grown * 2, limit);
+        }
+
+        for (std::size_t i : order) {
+            const auto& position = (*positions)[i];
+            const sf::Vector2u size = sources[i]->getSize();
+            rects[i * 4] = static_cast<std::uint32_t>(position.x);
+            rects[i * 4 + 1] = static_cast<std::uint32_t>(position.y);
+            rects[i * 4 + 2] = size.x;
+            rects[i * 4 + 3] = size.y;
+            atlasSize.x = std::max(atlasSize.x, static_cast<unsigned int>(position.x) + size.x);
+            atlasSize.y = std::max(atlasSize.y, static_cast<unsigned int>(position.y) + size.y);
+        }
+    }
+
+    auto atlas = std::make_unique<sf::Image>();
+    {
+        py::gil_scoped_release release;
+        std::vector<std::uint8_t> pixels(static_cast<std::size_t>(atlasSize.x) * atlasSize.y * 4, 0);
+        parallel_for(order.size(), workers, [&](std::size_t k) {
+            const std::size_t i = order[k];
+            const std::uint8_t* source = sources[i]->getPixelsPtr();
+            const std::size_t rowBytes = static_cast<std::size_t>(rects[i * 4 + 2]) * 4;
+            for (std::uint32_t row = 0; row < rects[i * 4 + 3]; ++row) {
+                const std::size_t offset = ((static_cast<std::size_t>(rects[i * 4 + 1]) + row) * atlasSize.x + rects[i * 4]) * 4;
+                std::memcpy(pixels.data() + offset, source + row * rowBytes, rowBytes);
+            }
+        });
+        if (atlasSize.x > 0 && atlasSize.y > 0) {
+            atlas->resize(atlasSize, pixels.data());
+        }
+    }
+    return py::make_tuple(std::move(atlas), new_index_buffer(rects, 4));
+}
@@ -0,0 +1,303 @@
+#include "bind_Assets.hpp"
+#include "SFML/Audio/SoundBuffer.hpp"
+#include "SFML/Graphics/Font.hpp"
+#include "SFML/Graphics/Image.hpp"
+#include <cstdint>
+#include <filesystem>
+#include <iterator>
+#include <memory>
+#include <string>
+#include <unordered_map>
+#include <unordered_set>
+#include <variant>
+#include <vector>
+
+namespace {
+using Asset = std::variant<std::unique_ptr<sf::Image>, std::unique_ptr<sf::SoundBuffer>, std::unique_ptr<sf::Font>>;
+
+struct AssetRequest {
+    Asset asset;
+    std::string filename;
+    const void* data = nullptr;
+    std::size_t size = 0;
+    bool loaded = false;
+};
+
+bool is_path(const py::handle& source) {
+    return py::isinstance<py::str>(source) || py::hasattr(source, "__fspath__");
+}
+
+std::size_t asset_kind(const py::handle& type) {
+    if (type.is(py::type::of<sf::Image>())) {
+        return 0;
+    }
+    if (type.is(py::type::of<sf::SoundBuffer>())) {
+        return 1;
+    }
+    if (type.is(py::type::of<sf::Font>())) {
+        return 2;
+    }
+    throw py::type_error("assets must be Image, SoundBuffer or Font, got " + std::string(py::str(type)));
+}
+
+Asset new_asset(std::size_t kind) {
+    switch (kind) {
+        case 0:
+            return std::make_unique<sf::Image>();
+        case 1:
+            return std::make_unique<sf::SoundBuffer>();
+        default:
+            return std::make_unique<sf::Font>();
+    }
+}
+
+std::size_t asset_bytes(const py::handle& asset, const std::string& filename) {
+    if (py::isinstance<sf::Image>(asset)) {
+        const sf::Vector2u size = asset.cast<sf::Image&>().getSize();
+        return static_cast<std::size_t>(size.x) * size.y * 4;
+    }
+    if (py::isinstance<sf::SoundBuffer>(asset)) {
+        return static_cast<std::size_t>(asset.cast<sf::SoundBuffer&>().getSampleCount()) * sizeof(std::int16_t);
+    }
+    // A font keeps its file open and loads glyphs on demand, its file size is the closest estimate.
+    std::error_code error;
+    const std::uintmax_t size = std::filesystem::file_size(filename, error);
+    return error ? 0 : static_cast<std::size_t>(size);
+}
+
+std::string fspath(const py::handle& path) {
+    return py::module_::import("os").attr("fspath")(path).cast<std::string>();
+}
+
+bool load_asset(sf::Image& image, const AssetRequest& request) {
+    return request.data ? image.loadFromMemory(request.data, request.size) : image.loadFromFile(request.filename);
+}
+
+bool load_asset(sf::SoundBuffer& soundBuffer, const AssetRequest& request) {
+    return request.data ? soundBuffer.loadFromMemory(request.data, request.size) : soundBuffer.loadFromFile(request.filename);
+}
+
+bool load_asset(sf::Font& font, const AssetRequest& request) {
+    return request.data ? font.openFromMemory(request.data, request.size) : font.openFromFile(request.filename);
+}
+}
+
+py::list load_many(const py::iterable& specs, unsigned int workers) {
+    std::vector<AssetRequest> requests;
+    std::vector<py::object> sources;
+    std::vector<py::buffer_info> buffers;
+    for (const py::handle& spec : specs) {
+        const py::tuple pair = py::reinterpret_borrow<py::object>(spec).cast<py::tuple>();
+        if (pair.size() != 2) {
+            throw py::value_error("asset specs must be (type, source) pairs, got " + std::to_string(pair.size()) + " items");
+        }
+
+        AssetRequest request{ new_asset(asset_kind(pair[0])) };
+        if (is_path(pair[1])) {
+            request.filename = fspath(pair[1]);
+        } else {
+            py::buffer_info info = py::reinterpret_borrow<py::buffer>(pair[1]).request();
+            require_c_contiguous(info, "asset data");
+            request.data = info.ptr;
+            request.size = static_cast<std::size_t>(info.size) * static_cast<std::size_t>(info.itemsize);
+            buffers.push_back(std::move(info));
+        }
+        requests.push_back(std::move(request));
+        sources.push_back(pair[1]);
+    }
+
+    {
+        py::gil_scoped_release release;
+        parallel_for(requests.size(), workers, [&requests](std::size_t i) {
+            AssetRequest& request = requests[i];
+            request.loaded = std::visit([&request](auto& asset) { return load_asset(*asset, request); }, request.asset);
+        });
+    }
+
+    py::list result;
+    for (std::size_t i = 0; i < requests.size(); ++i) {
+        AssetRequest& request = requests[i];
+        if (!request.loaded) {
+            result.append(py::none());
+            continue;
+        }
+        py::object asset = std::visit([](auto& asset) { return py::cast(std::move(asset)); }, request.asset);
+        if (request.data && std::holds_alternative<std::unique_ptr<sf::Font>>(request.asset)) {
+            // A font keeps reading the memory it was opened from, until it is opened again.
+            replace_keep_alive_impl(asset, sources[i]);
+        }
+        result.append(asset);
+    }
+    return result;
+}
+
+AssetCache::AssetCache(std::size_t maxBytes, bool hashContent) : m_maxBytes(maxBytes), m_hashContent(hashContent) {
+}
+
+py::object AssetCache::load(const py::object& type, const py::object& path) {
+    return loadMany(py::make_tuple(py::make_tuple(type, path)), 1)[0];
+}
+
+py::list AssetCache::loadMany(const py::iterable& specs, unsigned int workers) {
+    std::vector<std::optional<std::string>> keys;
+    std::vector<std::string> filenames;
+    py::list result;
+    py::list misses;
+    std::vector<std::size_t> missIndices;
+    std::unordered_map<std::string, std::size_t> pending;
+    for (const py::handle& spec : specs) {
+        const py::tuple pair = py::reinterpret_borrow<py::object>(spec).cast<py::tuple>();
+        if (pair.size() != 2) {
+            throw py::value_error("asset specs must be (type, path) pairs, got " + std::to_string(pair.size()) + " items");
+        }
+        const std::string filename = fspath(pair[1]);
+        std::optional<std::string> key = cacheKey(asset_kind(pair[0]), filename);
+
+        const auto entry = key ? m_index.find(*key) : m_index.end();
+        if (entry != m_index.end()) {
+            ++m_hits;
+            m_entries.splice(m_entries.begin(), m_entries, entry->second);
+            result.append(entry->second->asset);
+        } else if (key && pending.count(*key)) {
+            ++m_hits;
+            result.append(py::none());
+            missIndices.push_back(pending[*key]);
+        } else {
+            ++m_misses;
+            if (key) {
+                pending[*key] = misses.size();
+            }
+            result.append(py::none());
+            missIndices.push_back(misses.size());
+            misses.append(py::make_tuple(pair[0], filename));
+        }
+        keys.push_back(std::move(key));
+        filenames.push_back(filename);
+    }
+
+    const py::list loaded = load_many(misses, workers);
+    std::size_t missIndex = 0;
+    for (std::size_t i = 0; i < keys.size(); ++i) {
+        if (!result[i].is_none()) {
+            continue;
+        }
+        const py::object asset = loaded[missIndices[missIndex++]];
+        result[i] = asset;
+        if (!asset.is_none() && keys[i] && !m_index.count(*keys[i])) {
+            insert(*keys[i], asset, asset_bytes(asset, filenames[i]));
+        }
+    }
+    pruneDigests();
+    return result;
+}
+
+void AssetCache::clear() {
+    m_entries.clear();
+    m_index.clear();
+    m_digests.clear();
+    m_bytes = 0;
+}
+
+void AssetCache::setMaxBytes(std::size_t maxBytes) {
+    m_maxBytes = maxBytes;
+    evict();
+    pruneDigests();
+}
+
+std::size_t AssetCache::getMaxBytes() const {
+    return m_maxBytes;
+}
+
+std::size_t AssetCache::getSize() const {
+    return m_bytes;
+}
+
+std::size_t AssetCache::getCount() const {
+    return m_entries.size();
+}
+
+std::uint64_t AssetCache::getHitCount() const {
+    return m_hits;
+}
+
+std::uint64_t AssetCache::getMissCount() const {
+    return m_misses;
+}
+
+std::uint64_t AssetCache::getEvictionCount() const {
+    return m_evictions;
+}
+
+std::optional<std::string> AssetCache::cacheKey(std::size_t kind, const std::string& filename) {
+    std::error_code error;
+    const std::filesystem::path path = std::filesystem::absolute(filename, error).lexically_normal();
+    const auto writeTime = std::filesystem::last_write_time(path, error);
+    if (error) {
+        return std::nullopt;
+    }
+    if (!m_hashContent) {
+        return std::to_string(kind) + ":" + std::to_string(writeTime.time_since_epoch().count()) + ":" + path.u8string();
+    }
+
+    const std::uintmax_t size = std::filesystem::file_size(path, error);
+    if (error) {
+        return std::nullopt;
+    }
+    // The digest is only computed again when the file changed, so a cache hit costs a stat.
+    ContentDigest& digest = m_digests[path.u8string()];
+    if (digest.digest.empty() || digest.writeTime != writeTime || digest.size != size) {
+        // The mapped file is hashed without a copy, and hashlib releases the GIL while hashing large data.
+        py::object hash = py::module_::import("hashlib").attr("blake2b")(load_mapped(path.u8string()), py::arg("digest_size") = 20);
+        digest = { writeTime, size, hash.attr("hexdigest")().cast<std::string>() };
+    }
+    return std::to_string(kind) + ":" + digest.digest;
+}
+
+void AssetCache::insert(const std::string& key, const py::object& asset, std::size_t bytes) {
+    m_entries.push_front({ key, asset, bytes });
+    m_index[key] = m_entries.begin();
+    m_bytes += bytes;
+    evict();
+}
+
+void AssetCache::pruneDigests() {
+    // Scanning is amortised: the memo may hold up to twice as many paths as the cache holds assets.
+    if (m_digests.size() <= 2 * m_entries.size() + 16) {
+        return;
+    }
+    std::unordered_set<std::string> cached;
+    for (const Entry& entry : m_entries) {
+        cached.insert(entry.key.substr(entry.key.find(':') + 1));
+    }
+    for (auto it = m_digests.begin(); it != m_digests.end();) {
+        it = cached.count(it->second.digest) ? std::next(it) : m_digests.erase(it);
+    }
+}
+
+void AssetCache::evict() {
+    // The most recent entry is kept even if it is larger than the budget on its own.
+    while (m_maxBytes > 0 && m_bytes > m_maxBytes && m_entries.size() > 1) {
+        const Entry& entry = m_entries.back();
+        m_bytes -= entry.bytes;
+        m_index.erase(entry.key);
+        m_entries.pop_back();
+        ++m_evictions;
+    }
+}
+
+void bind_Assets(py::module &m_sf) {
+    m_sf.def("loadMany", &load_many, "\\brief Load many assets in parallel\n\nThe assets are decoded on native threads with the GIL released, so loading\nhundreds of images and sounds uses every core. Each spec is a `(type, source)`\npair, where `type` is `Image`, `SoundBuffer` or `Font` and `source` is a path\nor a buffer holding the content of the file (e.g. from `loadMapped`).\n\n\\param specs   Assets to load\n\n\\param workers Number of threads, the number of cores by default\n\n\\return List of the loaded assets in the order of `specs`, with `None` for the ones which failed to load", py::arg("specs"), py::arg("workers") = 0);
+
+    auto v_AssetCache = py::class_<AssetCache>(m_sf, "AssetCache", "\\brief Cache sharing loaded images, sound buffers and fonts\n\nLoading a file which is already in the cache returns the same object instead\nof decoding it again, so the cached assets are shared and should not be\nmodified. Files are identified by their path and modification time, or by\ntheir content when `hashContent` is set, so that copies of a file are shared\ntoo. When the estimated memory of the cached assets exceeds `maxBytes`, the\nleast recently used ones are dropped from the cache; they stay valid for the\ncode still holding them.");
+    v_AssetCache.def(py::init<std::size_t, bool>(), "\\brief Create an empty cache\n\n\\param maxBytes    Memory budget of the cached assets in bytes, 0 for no limit\n\n\\param hashContent Identify files by a BLAKE2 hash of their content instead of their path and modification time, a file is only hashed again once it changed", py::arg("maxBytes") = 0, py::arg("hashContent") = false);
+    v_AssetCache.def("load", &AssetCache::load, "\\brief Get an asset from the cache, loading it on a miss\n\n\\param type `Image`, `SoundBuffer` or `Font`\n\n\\param path Path of the file\n\n\\return The shared asset, or `None` if it failed to load", py::arg("type"), py::arg("path"));
+    v_AssetCache.def("loadMany", &AssetCache::loadMany, "\\brief Get many assets from the cache, loading the missing ones in parallel\n\nThe missing assets are loaded like `loadMany`.\n\n\\param specs   `(type, path)` pairs\n\n\\param workers Number of threads, the number of cores by default\n\n\\return List of the shared assets in the order of `specs`, with `None` for the ones which failed to load", py::arg("specs"), py::arg("workers") = 0);
+    v_AssetCache.def("clear", &AssetCache::clear, "\\brief Drop every asset from the cache");
+    v_AssetCache.def("setMaxBytes", &AssetCache::setMaxBytes, "\\brief Change the memory budget, evicting assets if needed", py::arg("maxBytes"));
+    v_AssetCache.def("getMaxBytes", &AssetCache::getMaxBytes, "\\brief Get the memory budget in bytes, 0 for no limit");
+    v_AssetCache.def("getSize", &AssetCache::getSize, "\\brief Get the estimated memory of the cached assets in bytes");
+    v_AssetCache.def("getHitCount", &AssetCache::getHitCount, "\\brief Get the number of assets found in the cache");
+    v_AssetCache.def("getMissCount", &AssetCache::getMissCount, "\\brief Get the number of assets which had to be loaded");
+    v_AssetCache.def("getEvictionCount", &AssetCache::getEvictionCount, "\\brief Get the number of assets dropped to stay within the memory budget");
+    v_AssetCache.def("__len__", &AssetCache::getCount);
+}
@@ -0,0 +1,307 @@
+#include "bind_SpatialGrid.hpp"
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <memory>
+#include <string>
+
+namespace {
+struct Bounds {
+    float left;
+    float top;
+    float right;
+    float bottom;
+};
+
+Bounds getBounds(const sf::FloatRect& rect) {
+    return {
+        std::min(rect.position.x, rect.position.x + rect.size.x),
+        std::min(rect.position.y, rect.position.y + rect.size.y),
+        std::max(rect.position.x, rect.position.x + rect.size.x),
+        std::max(rect.position.y, rect.position.y + rect.size.y),
+    };
+}
+
+bool intersects(const Bounds& a, const Bounds& b) {
+    return std::max(a.left, b.left) < std::min(a.right, b.right) && std::max(a.top, b.top) < std::min(a.bottom, b.bottom);
+}
+}
+
+SpatialGrid::SpatialGrid(float cellSize) : m_cellSize(cellSize) {
+    if (!(cellSize > 0.f)) {
+        throw py::value_error("cellSize must be positive");
+    }
+}
+
+void SpatialGrid::assign(const sf::FloatRect* rects, std::size_t count) {
+    if (count > std::numeric_limits<std::uint32_t>::max()) {
+        throw py::value_error("too many rectangles for a spatial grid");
+    }
+    checkFinite(rects, count);
+    std::unique_lock lock(m_mutex);
+    m_rects.assign(rects, rects + count);
+    m_ranges.resize(count);
+    m_cells.clear();
+    m_overflow.clear();
+    for (std::uint32_t id = 0; id < count; ++id) {
+        insert(id);
+    }
+}
+
+void SpatialGrid::update(const std::vector<std::int64_t>& ids, const sf::FloatRect* rects, std::size_t count) {
+    checkFinite(rects, count);
+    std::unique_lock lock(m_mutex);
+    for (std::size_t i = 0; i < count; ++i) {
+        checkedId(ids[i]);
+    }
+    for (std::size_t i = 0; i < count; ++i) {
+        const std::uint32_t id = static_cast<std::uint32_t>(ids[i]);
+        remove(id);
+        m_rects[id] = rects[i];
+        insert(id);
+    }
+}
+
+std::vector<std::uint32_t> SpatialGrid::query(const sf::FloatRect& rect) const {
+    std::shared_lock lock(m_mutex);
+    // A rectangle is listed in every cell it covers, candidates are deduplicated before the intersection test.
+    std::vector<std::uint32_t> candidates(m_overflow.begin(), m_overflow.end());
+    const CellRange range = cellRange(rect);
+    if (cellCount(range) > m_cells.size()) {
+        for (const auto& [key, ids] : m_cells) {
+            candidates.insert(candidates.end(), ids.begin(), ids.end());
+        }
+    } else {
+        for (std::int32_t y = range.top; y <= range.bottom; ++y) {
+            for (std::int32_t x = range.left; x <= range.right; ++x) {
+                const auto cell = m_cells.find(cellKey(x, y));
+                if (cell != m_cells.end()) {
+                    candidates.insert(candidates.end(), cell->second.begin(), cell->second.end());
+                }
+            }
+        }
+    }
+    std::sort(candidates.begin(), candidates.end());
+    candidates.erase(std::unique(candidates.begin(), candidates.end()), candidates.end());
+
+    std::vector<std::uint32_t> result;
+    const Bounds bounds = getBounds(rect);
+    for (std::uint32_t id : candidates) {
+        if (intersects(bounds, getBounds(m_rects[id]))) {
+            result.push_back(id);
+        }
+    }
+    return result;
+}
+
+std::vector<std::uint32_t> SpatialGrid::queryPoint(sf::Vector2f point) const {
+    std::shared_lock lock(m_mutex);
+    std::vector<std::uint32_t> result;
+    for (std::uint32_t id : m_overflow) {
+        if (m_rects[id].contains(point)) {
+            result.push_back(id);
+        }
+    }
+    const auto cell = m_cells.find(cellKey(cellCoordinate(point.x), cellCoordinate(point.y)));
+    if (cell != m_cells.end()) {
+        for (std::uint32_t id : cell->second) {
+            if (m_rects[id].contains(point)) {
+                result.push_back(id);
+            }
+        }
+    }
+    std::sort(result.begin(), result.end());
+    return result;
+}
+
+std::vector<std::uint32_t> SpatialGrid::allPairs() const {
+    std::shared_lock lock(m_mutex);
+    std::vector<std::pair<std::uint32_t, std::uint32_t>> pairs;
+    for (const auto& [key, ids] : m_cells) {
+        for (std::size_t i = 0; i < ids.size(); ++i) {
+            const Bounds first = getBounds(m_rects[ids[i]]);
+            for (std::size_t j = i + 1; j < ids.size(); ++j) {
+                const Bounds second = getBounds(m_rects[ids[j]]);
+                if (!intersects(first, second)) {
+                    continue;
+                }
+                // A pair shares every cell covered by its intersection, only the cell holding its top-left corner reports it.
+                const std::int32_t x = cellCoordinate(std::max(first.left, second.left));
+                const std::int32_t y = cellCoordinate(std::max(first.top, second.top));
+                if (cellKey(x, y) == key) {
+                    pairs.emplace_back(std::min(ids[i], ids[j]), std::max(ids[i], ids[j]));
+                }
+            }
+        }
+    }
+    // Overflow rectangles are in no cell, they are tested against the later overflow rectangles and every other one.
+    for (std::size_t i = 0; i < m_overflow.size(); ++i) {
+        const std::uint32_t first = m_overflow[i];
+        const Bounds bounds = getBounds(m_rects[first]);
+        const auto test = [&](std::uint32_t second) {
+            if (intersects(bounds, getBounds(m_rects[second]))) {
+                pairs.emplace_back(std::min(first, second), std::max(first, second));
+            }
+        };
+        for (std::size_t j = i + 1; j < m_overflow.size(); ++j) {
+            test(m_overflow[j]);
+        }
+        for (std::uint32_t second = 0; second < m_rects.size(); ++second) {
+            if (cellCount(m_ranges[second]) <= MaxCellsPerRect) {
+                test(second);
+            }
+        }
+    }
+    std::sort(pairs.begin(), pairs.end());
+
+    std::vector<std::uint32_t> result;
+    result.reserve(pairs.size() * 2);
+    for (const auto& [first, second] : pairs) {
+        result.push_back(first);
+        result.push_back(second);
+    }
+    return result;
+}
+
+std::size_t SpatialGrid::size() const {
+    std::shared_lock lock(m_mutex);
+    return m_rects.size();
+}
+
+float SpatialGrid::getCellSize() const {
+    return m_cellSize;
+}
+
+sf::FloatRect SpatialGrid::getRect(std::int64_t id) const {
+    std::shared_lock lock(m_mutex);
+    return m_rects[checkedId(id)];
+}
+
+std::int64_t SpatialGrid::cellKey(std::int32_t x, std::int32_t y) {
+    return (static_cast<std::int64_t>(x) << 32) | static_cast<std::uint32_t>(y);
+}
+
+std::uint64_t SpatialGrid::cellCount(const CellRange& range) {
+    return static_cast<std::uint64_t>(static_cast<std::int64_t>(range.right) - range.left + 1) *
+           static_cast<std::uint64_t>(static_cast<std::int64_t>(range.bottom) - range.top + 1);
+}
+
+void SpatialGrid::checkFinite(const sf::FloatRect* rects, std::size_t count) {
+    for (std::size_t i = 0; i < count; ++i) {
+        const sf::FloatRect& rect = rects[i];
+        if (!std::isfinite(rect.position.x) || !std::isfinite(rect.position.y) || !std::isfinite(rect.size.x) || !std::isfinite(rect.size.y)) {
+            throw py::value_error("spatial grid rectangle " + std::to_string(i) + " has a non-finite coordinate");
+        }
+    }
+}
+
+std::int32_t SpatialGrid::cellCoordinate(float value) const {
+    const float cell = std::floor(value / m_cellSize);
+    if (!(cell > static_cast<float>(std::numeric_limits<std::int32_t>::min()))) {
+        return std::numeric_limits<std::int32_t>::min();
+    }
+    // Keeping one below the maximum lets the cell loops use inclusive bounds without overflowing.
+    if (cell >= static_cast<float>(std::numeric_limits<std::int32_t>::max() - 1)) {
+        return std::numeric_limits<std::int32_t>::max() - 1;
+    }
+    return static_cast<std::int32_t>(cell);
+}
+
+SpatialGrid::CellRange SpatialGrid::cellRange(const sf::FloatRect& rect) const {
+    const Bounds bounds = getBounds(rect);
+    return { cellCoordinate(bounds.left), cellCoordinate(bounds.top), cellCoordinate(bounds.right), cellCoordinate(bounds.bottom) };
+}
+
+std::uint32_t SpatialGrid::checkedId(std::int64_t id) const {
+    if (id < 0 || id >= static_cast<std::int64_t>(m_rects.size())) {
+        throw py::index_error("spatial grid id " + std::to_string(id) + " out of range");
+    }
+    return static_cast<std::uint32_t>(id);
+}
+
+void SpatialGrid::insert(std::uint32_t id) {
+    const CellRange range = cellRange(m_rects[id]);
+    m_ranges[id] = range;
+    if (cellCount(range) > MaxCellsPerRect) {
+        m_overflow.push_back(id);
+        return;
+    }
+    for (std::int32_t y = range.top; y <= range.bottom; ++y) {
+        for (std::int32_t x = range.left; x <= range.right; ++x) {
+            m_cells[cellKey(x, y)].push_back(id);
+        }
+    }
+}
+
+void SpatialGrid::remove(std::uint32_t id) {
+    const CellRange& range = m_ranges[id];
+    if (cellCount(range) > MaxCellsPerRect) {
+        const auto it = std::find(m_overflow.begin(), m_overflow.end(), id);
+        if (it != m_overflow.end()) {
+            *it = m_overflow.back();
+            m_overflow.pop_back();
+        }
+        return;
+    }
+    for (std::int32_t y = range.top; y <= range.bottom; ++y) {
+        for (std::int32_t x = range.left; x <= range.right; ++x) {
+            const auto cell = m_cells.find(cellKey(x, y));
+            if (cell == m_cells.end()) {
+                continue;
+            }
+            std::vector<std::uint32_t>& ids = cell->second;
+            const auto it = std::find(ids.begin(), ids.end(), id);
+            if (it != ids.end()) {
+                *it = ids.back();
+                ids.pop_back();
+            }
+            if (ids.empty()) {
+                m_cells.erase(cell);
+            }
+        }
+    }
+}
+
+void bind_SpatialGrid(py::module &m_sf) {
+    auto v_sfSpatialGrid = py::class_<SpatialGrid>(m_sf, "SpatialGrid", "\\brief Uniform grid index over axis aligned rectangles\n\nThe grid answers rectangle and point queries and finds every pair of\nintersecting rectangles in a single native call, so collision detection does\nnot need one `findIntersection` call per pair. Rectangles are identified by\ntheir index in the array the grid was built from, and results are returned as\nsorted uint32 memoryviews of ids.");
+    v_sfSpatialGrid.def(py::init<>([](py::object rects, float cellSize) {
+        BufferView<sf::FloatRect, float> view(rects);
+        auto grid = std::make_unique<SpatialGrid>(cellSize);
+        grid->assign(view.data(), view.size());
+        return grid.release();
+    }), "\\brief Build the grid from rectangles\n\nThe cell size should be close to the size of a typical rectangle.\n\n\\param rects    C-contiguous float32 buffer of shape `(N, 4)` holding `(left, top, width, height)` rows, or a sequence of `FloatRect`\n\n\\param cellSize Width and height of a grid cell", py::arg("rects"), py::arg("cellSize"));
+    v_sfSpatialGrid.def("assign", [](SpatialGrid& self, py::object rects) {
+        BufferView<sf::FloatRect, float> view(rects);
+        py::gil_scoped_release release;
+        self.assign(view.data(), view.size());
+    }, "\\brief Rebuild the grid from new rectangles\n\n\\param rects Rectangles, in the same formats as the constructor", py::arg("rects"));
+    v_sfSpatialGrid.def("update", [](SpatialGrid& self, py::object ids, py::object rects) {
+        const std::vector<std::int64_t> idList = read_indices(ids);
+        BufferView<sf::FloatRect, float> view(rects);
+        if (idList.size() != view.size()) {
+            throw py::value_error("ids and rects must have the same length, got " + std::to_string(idList.size()) + " and " + std::to_string(view.size()));
+        }
+        py::gil_scoped_release release;
+        self.update(idList, view.data(), view.size());
+    }, "\\brief Move some rectangles of the grid\n\n\\param ids   Ids of the rectangles to move\n\n\\param rects New rectangles, one per id", py::arg("ids"), py::arg("rects"));
+    v_sfSpatialGrid.def("query", [](SpatialGrid& self, sf::FloatRect rect) {
+        std::vector<std::uint32_t> result;
+        {
+            py::gil_scoped_release release;
+            result = self.query(rect);
+        }
+        return new_index_buffer(result);
+    }, "\\brief Find the rectangles intersecting a rectangle\n\nLike `findIntersection`, rectangles which only touch are not intersecting.\n\n\\param rect Rectangle to test\n\n\\return Uint32 memoryview of shape `(K,)` with the sorted ids", py::arg("rect"));
+    v_sfSpatialGrid.def("queryPoint", [](SpatialGrid& self, sf::Vector2f point) { return new_index_buffer(self.queryPoint(point)); }, "\\brief Find the rectangles containing a point\n\nLike `contains`, a point on the right or bottom edge is outside.\n\n\\param point Point to test\n\n\\return Uint32 memoryview of shape `(K,)` with the sorted ids", py::arg("point"));
+    v_sfSpatialGrid.def("allPairs", [](SpatialGrid& self) {
+        std::vector<std::uint32_t> result;
+        {
+            py::gil_scoped_release release;
+            result = self.allPairs();
+        }
+        return new_index_buffer(result, 2);
+    }, "\\brief Find every pair of intersecting rectangles\n\n\\return Uint32 memoryview of shape `(K, 2)` with one `(first, second)` row per pair, `first < second`, sorted");
+    v_sfSpatialGrid.def("getRect", [](SpatialGrid& self, std::int64_t id) { return self.getRect(id); }, "\\brief Get the rectangle stored for an id", py::arg("id"));
+    v_sfSpatialGrid.def("getCellSize", [](SpatialGrid& self) { return self.getCellSize(); }, "\\brief Get the width and height of a grid cell");
+    v_sfSpatialGrid.def("__len__", [](SpatialGrid& self) { return self.size(); });
+}
@@ -0,0 +1,14 @@
+#include "bind_VectorArray.hpp"
+#include <sstream>
+
+std::string getVectorArrayDesc(int dimension) {
+    return (std::ostringstream() << "\\brief Contiguous array of " << dimension << "-dimensional float vectors\n\n"
+                                 << "Operations are applied to every vector in a single native call. The array\n"
+                                 << "supports the buffer protocol, so `numpy.asarray(array)` gives a writable\n"
+                                 << "float32 view of shape `(N, " << dimension << ")` over its vectors.").str();
+}
+
+void bind_VectorArray(py::module &m_sf) {
+    bind_Vector2ArrayT<float>(m_sf, "Vector2fArray");
+    bind_Vector3ArrayT<float>(m_sf, "Vector3fArray");
+}
@@ -0,0 +1,333 @@
+#include "buffer_utils.hpp"
+#include "SFML/Audio/InputSoundFile.hpp"
+#include "SFML/Audio/SoundBuffer.hpp"
+#include "SFML/Graphics/Image.hpp"
+#include "SFML/Graphics/Rect.hpp"
+#include "SFML/Graphics/Transform.hpp"
+#include "SFML/Graphics/VertexArray.hpp"
+#include <cstddef>
+#include <cstring>
+#include <string>
+#include <unordered_map>
+
+void require_c_contiguous(const py::buffer_info& info, const char* name) {
+    py::ssize_t expectedStride = info.itemsize;
+    for (py::ssize_t i = info.ndim - 1; i >= 0; --i) {
+        if (info.shape[i] > 1 && info.strides[i] != expectedStride) {
+            throw py::value_error(std::string(name) + " must be C-contiguous");
+        }
+        expectedStride *= info.shape[i];
+    }
+}
+
+void require_buffer_length(std::size_t size, std::uint64_t required, const char* name) {
+    if (required > size) {
+        throw py::value_error(std::string(name) + " holds " + std::to_string(size) + " items, but " + std::to_string(required) + " are required");
+    }
+}
+
+RawBufferView::RawBufferView(const py::object& data, bool writable) {
+    if (!PyObject_CheckBuffer(data.ptr())) {
+        throw py::type_error("expected a buffer-protocol object, got " + std::string(py::str(py::type::of(data).attr("__name__"))));
+    }
+    // Raw memory parameters take the bytes of any buffer, whatever its item format.
+    m_info = py::reinterpret_borrow<py::buffer>(data).request(writable);
+    require_c_contiguous(m_info, "buffer");
+}
+
+void* RawBufferView::data() const {
+    return m_info.ptr;
+}
+
+std::size_t RawBufferView::size() const {
+    return static_cast<std::size_t>(m_info.size) * static_cast<std::size_t>(m_info.itemsize);
+}
+
+RawBufferView::operator void*() const {
+    return m_info.ptr;
+}
+
+namespace {
+py::object allocate_buffer(py::ssize_t rows, const py::tuple& shape, std::size_t rowBytes, const char* format, void** data) {
+    // memoryview.cast() rejects zeros in the shape, so an empty result is sliced out of a one row buffer.
+    const py::ssize_t allocatedRows = rows > 0 ? rows : 1;
+    py::bytearray storage(nullptr, static_cast<std::size_t>(allocatedRows) * rowBytes);
+    *data = PyByteArray_AsString(storage.ptr());
+
+    py::object view = py::memoryview(storage).attr("cast")(format, shape);
+    if (rows == 0) {
+        view = view[py::slice(0, 0, 1)];
+    }
+    return view;
+}
+}
+
+py::object new_float_buffer(py::ssize_t count, float** data) {
+    return allocate_buffer(count, py::make_tuple(count > 0 ? count : 1), sizeof(float), "f", reinterpret_cast<void**>(data));
+}
+
+py::object new_float_buffer(py::ssize_t rows, py::ssize_t columns, float** data) {
+    return allocate_buffer(rows, py::make_tuple(rows > 0 ? rows : 1, columns), columns * sizeof(float), "f", reinterpret_cast<void**>(data));
+}
+
+py::object new_index_buffer(const std::vector<std::uint32_t>& indices, py::ssize_t columns) {
+    const py::ssize_t rows = static_cast<py::ssize_t>(indices.size()) / columns;
+    const py::tuple shape = columns == 1 ? py::tuple(py::make_tuple(rows > 0 ? rows : 1)) : py::tuple(py::make_tuple(rows > 0 ? rows : 1, columns));
+    void* data = nullptr;
+    py::object output = allocate_buffer(rows, shape, columns * sizeof(std::uint32_t), "I", &data);
+    if (!indices.empty()) {
+        std::memcpy(data, indices.data(), indices.size() * sizeof(std::uint32_t));
+    }
+    return output;
+}
+
+namespace {
+template <typename Integer>
+void append_indices(const py::buffer_info& info, std::vector<std::int64_t>& indices) {
+    const auto* data = static_cast<const Integer*>(info.ptr);
+    indices.insert(indices.end(), data, data + info.size);
+}
+}
+
+std::vector<std::int64_t> read_indices(const py::object& indices) {
+    if (!PyObject_CheckBuffer(indices.ptr())) {
+        return indices.cast<std::vector<std::int64_t>>();
+    }
+
+    py::buffer_info info = py::reinterpret_borrow<py::buffer>(indices).request();
+    require_c_contiguous(info, "indices");
+
+    std::vector<std::int64_t> result;
+    result.reserve(static_cast<std::size_t>(info.size));
+    if (buffer_format_matches<std::int8_t>(info)) {
+        append_indices<std::int8_t>(info, result);
+    } else if (buffer_format_matches<std::int16_t>(info)) {
+        append_indices<std::int16_t>(info, result);
+    } else if (buffer_format_matches<std::int32_t>(info)) {
+        append_indices<std::int32_t>(info, result);
+    } else if (buffer_format_matches<std::int64_t>(info)) {
+        append_indices<std::int64_t>(info, result);
+    } else if (buffer_format_matches<std::uint8_t>(info)) {
+        append_indices<std::uint8_t>(info, result);
+    } else if (buffer_format_matches<std::uint16_t>(info)) {
+        append_indices<std::uint16_t>(info, result);
+    } else if (buffer_format_matches<std::uint32_t>(info)) {
+        append_indices<std::uint32_t>(info, result);
+    } else if (buffer_format_matches<std::uint64_t>(info)) {
+        append_indices<std::uint64_t>(info, result);
+    } else {
+        throw py::type_error("indices must be a buffer of integers, got format '" + info.format + "' with item size " + std::to_string(info.itemsize));
+    }
+    return result;
+}
+
+py::object load_mapped(const std::string& path) {
+    py::module_ mmap = py::module_::import("mmap");
+    py::object file = py::module_::import("io").attr("open")(path, "rb");
+    py::object mapped;
+    try {
+        py::object fileno = file.attr("fileno")();
+        // Empty files cannot be mapped, they are served from an empty bytes object instead.
+        if (py::module_::import("os").attr("fstat")(fileno).attr("st_size").cast<std::int64_t>() == 0) {
+            mapped = py::bytes();
+        } else {
+            mapped = mmap.attr("mmap")(fileno, 0, py::arg("access") = mmap.attr("ACCESS_READ"));
+        }
+    } catch (...) {
+        file.attr("close")();
+        throw;
+    }
+    file.attr("close")();
+    return py::memoryview(mapped);
+}
+
+namespace {
+// Live exports per instance, only touched with the GIL held. Never destroyed, like the replace_keep_alive patients.
+std::unordered_map<PyObject*, std::size_t>& buffer_exports() {
+    static auto& exports = *new std::unordered_map<PyObject*, std::size_t>();
+    return exports;
+}
+
+getbufferproc base_getbuffer = nullptr;
+releasebufferproc base_releasebuffer = nullptr;
+
+int tracked_getbuffer(PyObject* obj, Py_buffer* view, int flags) {
+    if (base_getbuffer(obj, view, flags) != 0) {
+        return -1;
+    }
+    ++buffer_exports()[obj];
+    return 0;
+}
+
+void tracked_releasebuffer(PyObject* obj, Py_buffer* view) {
+    auto& exports = buffer_exports();
+    const auto it = exports.find(obj);
+    if (it != exports.end() && --it->second == 0) {
+        exports.erase(it);
+    }
+    base_releasebuffer(obj, view);
+}
+}
+
+void track_buffer_exports(py::handle cls) {
+    PyBufferProcs* procs = reinterpret_cast<PyTypeObject*>(cls.ptr())->tp_as_buffer;
+    if (procs == nullptr || procs->bf_getbuffer == nullptr) {
+        py::pybind11_fail("track_buffer_exports: the class was not bound with py::buffer_protocol()");
+    }
+    if (procs->bf_getbuffer == tracked_getbuffer) {
+        return;
+    }
+    // pybind11 binds every buffer-protocol class to the same pair of slots, which are wrapped here.
+    base_getbuffer = procs->bf_getbuffer;
+    base_releasebuffer = procs->bf_releasebuffer;
+    procs->bf_getbuffer = tracked_getbuffer;
+    procs->bf_releasebuffer = tracked_releasebuffer;
+}
+
+void require_no_buffer_exports(py::handle owner) {
+    if (buffer_exports().count(owner.ptr()) > 0) {
+        throw py::buffer_error("Existing exports of data: object cannot be re-sized");
+    }
+}
+
+void require_no_buffer_exports(const sf::Image& image) {
+    // Finds the Python object wrapping the image, the one whose exports are counted.
+    require_no_buffer_exports(py::cast(&image, py::return_value_policy::reference));
+}
+
+void require_no_buffer_exports(const sf::VertexArray& vertexArray) {
+    require_no_buffer_exports(py::cast(&vertexArray, py::return_value_policy::reference));
+}
+
+py::buffer_info image_buffer_info(sf::Image& image) {
+    const sf::Vector2u size = image.getSize();
+    return py::buffer_info(
+        const_cast<std::uint8_t*>(image.getPixelsPtr()),
+        sizeof(std::uint8_t),
+        py::format_descriptor<std::uint8_t>::format(),
+        3,
+        { static_cast<py::ssize_t>(size.y), static_cast<py::ssize_t>(size.x), py::ssize_t(4) },
+        { static_cast<py::ssize_t>(size.x) * 4, py::ssize_t(4), py::ssize_t(1) }
+    );
+}
+
+void image_set_pixels(sf::Image& image, const py::buffer& pixels, std::optional<sf::Vector2u> size) {
+    py::buffer_info info = pixels.request();
+    require_c_contiguous(info, "pixels");
+
+    const sf::Vector2u targetSize = size.value_or(image.getSize());
+    const std::size_t expectedBytes = static_cast<std::size_t>(targetSize.x) * targetSize.y * 4;
+    const std::size_t actualBytes = static_cast<std::size_t>(info.size) * static_cast<std::size_t>(info.itemsize);
+    if (actualBytes != expectedBytes) {
+        throw py::value_error(
+            "pixels must contain " + std::to_string(expectedBytes) + " bytes (width * height * 4), got " + std::to_string(actualBytes)
+        );
+    }
+
+    if (targetSize != image.getSize()) {
+        require_no_buffer_exports(image);
+    }
+
+    const auto* data = static_cast<const std::uint8_t*>(info.ptr);
+    py::gil_scoped_release release;
+    if (targetSize != image.getSize()) {
+        image.resize(targetSize, data);
+    } else if (expectedBytes > 0) {
+        std::memcpy(const_cast<std::uint8_t*>(image.getPixelsPtr()), data, expectedBytes);
+    }
+}
+
+const std::string& vertex_buffer_format() {
+    static_assert(offsetof(sf::Vertex, position) == 0, "unexpected sf::Vertex layout");
+    static_assert(offsetof(sf::Vertex, color) == 2 * sizeof(float), "unexpected sf::Vertex layout");
+    static_assert(offsetof(sf::Vertex, texCoords) == 2 * sizeof(float) + 4, "unexpected sf::Vertex layout");
+    static_assert(sizeof(sf::Vertex) == 4 * sizeof(float) + 4, "unexpected sf::Vertex layout");
+
+    static const std::string format = "T{(2)f:position:(4)B:color:(2)f:texCoords:}";
+    return format;
+}
+
+py::buffer_info sound_buffer_info(sf::SoundBuffer& soundBuffer) {
+    return py::buffer_info(
+        const_cast<std::int16_t*>(soundBuffer.getSamples()),
+        sizeof(std::int16_t),
+        py::format_descriptor<std::int16_t>::format(),
+        1,
+        { static_cast<py::ssize_t>(soundBuffer.getSampleCount()) },
+        { static_cast<py::ssize_t>(sizeof(std::int16_t)) },
+        true
+    );
+}
+
+std::uint64_t input_sound_file_read_into(sf::InputSoundFile& file, const py::object& samples) {
+    BufferView<std::int16_t> view(samples, true);
+
+    py::gil_scoped_release release;
+    return file.read(view.data(), view.size());
+}
+
+py::buffer_info vertex_array_buffer_info(sf::VertexArray& vertexArray) {
+    const std::size_t count = vertexArray.getVertexCount();
+    return py::buffer_info(
+        count > 0 ? &vertexArray[0] : nullptr,
+        sizeof(sf::Vertex),
+        vertex_buffer_format(),
+        1,
+        { static_cast<py::ssize_t>(count) },
+        { static_cast<py::ssize_t>(sizeof(sf::Vertex)) }
+    );
+}
+
+void vertex_array_assign(sf::VertexArray& vertexArray, const py::object& vertices) {
+    BufferView<sf::Vertex, std::uint8_t> view(vertices);
+    if (view.size() != vertexArray.getVertexCount()) {
+        require_no_buffer_exports(vertexArray);
+    }
+
+    py::gil_scoped_release release;
+    vertexArray.resize(view.size());
+    if (view.size() > 0) {
+        std::memcpy(&vertexArray[0], view.data(), view.size() * sizeof(sf::Vertex));
+    }
+}
+
+py::object transform_matrix_view(const sf::Transform& transform) {
+    float* result = nullptr;
+    py::object output = new_float_buffer(4, 4, &result);
+    std::memcpy(result, transform.getMatrix(), 16 * sizeof(float));
+    return output;
+}
+
+py::object transform_points(const sf::Transform& transform, const py::object& points) {
+    BufferView<sf::Vector2f, float> view(points);
+    float* result = nullptr;
+    py::object output = new_float_buffer(static_cast<py::ssize_t>(view.size()), 2, &result);
+
+    {
+        py::gil_scoped_release release;
+        for (std::size_t i = 0; i < view.size(); ++i) {
+            const sf::Vector2f point = transform.transformPoint(view.data()[i]);
+            result[i * 2] = point.x;
+            result[i * 2 + 1] = point.y;
+        }
+    }
+    return output;
+}
+
+py::object transform_rects(const sf::Transform& transform, const py::object& rects) {
+    BufferView<sf::FloatRect, float> view(rects);
+    float* result = nullptr;
+    py::object output = new_float_buffer(static_cast<py::ssize_t>(view.size()), 4, &result);
+
+    {
+        py::gil_scoped_release release;
+        for (std::size_t i = 0; i < view.size(); ++i) {
+            const sf::FloatRect rect = transform.transformRect(view.data()[i]);
+            result[i * 4] = rect.position.x;
+            result[i * 4 + 1] = rect.position.y;
+            result[i * 4 + 2] = rect.size.x;
+            result[i * 4 + 3] = rect.size.y;
+        }
+    }
+    return output;
+}
@@ -0,0 +1,176 @@
+#include "event_utils.hpp"
+#include "SFML/Window/Event.hpp"
+#include "SFML/Window/WindowBase.hpp"
+#include <cstddef>
+#include <optional>
+#include <type_traits>
+
+namespace {
+template <typename>
+constexpr bool dependent_false = false;
+
+std::uint32_t key_modifiers(bool alt, bool control, bool shift, bool system) {
+    return (alt ? 1u : 0u) | (control ? 2u : 0u) | (shift ? 4u : 0u) | (system ? 8u : 0u);
+}
+}
+
+const std::string& event_buffer_format() {
+    static_assert(sizeof(EventRecord) == 6 * 4 + 3 * sizeof(float), "unexpected EventRecord layout");
+
+    static const std::string format = "T{i:type:i:code:i:scancode:I:modifiers:i:x:i:y:(3)f:value:}";
+    return format;
+}
+
+EventRecord event_record(const sf::Event& event) {
+    EventRecord record{};
+    event.visit([&record](const auto& data) {
+        using T = std::decay_t<decltype(data)>;
+        if constexpr (std::is_same_v<T, sf::Event::Closed>) {
+            record.type = static_cast<std::int32_t>(EventType::Closed);
+        } else if constexpr (std::is_same_v<T, sf::Event::Resized>) {
+            record.type = static_cast<std::int32_t>(EventType::Resized);
+            record.x = static_cast<std::int32_t>(data.size.x);
+            record.y = static_cast<std::int32_t>(data.size.y);
+        } else if constexpr (std::is_same_v<T, sf::Event::FocusLost>) {
+            record.type = static_cast<std::int32_t>(EventType::FocusLost);
+        } else if constexpr (std::is_same_v<T, sf::Event::FocusGained>) {
+            record.type = static_cast<std::int32_t>(EventType::FocusGained);
+        } else if constexpr (std::is_same_v<T, sf::Event::TextEntered>) {
+            record.type = static_cast<std::int32_t>(EventType::TextEntered);
+            record.code = static_cast<std::int32_t>(data.unicode);
+        } else if constexpr (std::is_same_v<T, sf::Event::KeyPressed> || std::is_same_v<T, sf::Event::KeyReleased>) {
+            record.type = static_cast<std::int32_t>(std::is_same_v<T, sf::Event::KeyPressed> ? EventType::KeyPressed : EventType::KeyReleased);
+            record.code = static_cast<std::int32_t>(data.code);
+            record.scancode = static_cast<std::int32_t>(data.scancode);
+            record.modifiers = key_modifiers(data.alt, data.control, data.shift, data.system);
+        } else if constexpr (std::is_same_v<T, sf::Event::MouseWheelScrolled>) {
+            record.type = static_cast<std::int32_t>(EventType::MouseWheelScrolled);
+            record.code = static_cast<std::int32_t>(data.wheel);
+            record.x = data.position.x;
+            record.y = data.position.y;
+            record.value[0] = data.delta;
+        } else if constexpr (std::is_same_v<T, sf::Event::MouseButtonPressed> || std::is_same_v<T, sf::Event::MouseButtonReleased>) {
+            record.type = static_cast<std::int32_t>(
+                std::is_same_v<T, sf::Event::MouseButtonPressed> ? EventType::MouseButtonPressed : EventType::MouseButtonReleased
+            );
+            record.code = static_cast<std::int32_t>(data.button);
+            record.x = data.position.x;
+            record.y = data.position.y;
+        } else if constexpr (std::is_same_v<T, sf::Event::MouseMoved>) {
+            record.type = static_cast<std::int32_t>(EventType::MouseMoved);
+            record.x = data.position.x;
+            record.y = data.position.y;
+        } else if constexpr (std::is_same_v<T, sf::Event::MouseMovedRaw>) {
+            record.type = static_cast<std::int32_t>(EventType::MouseMovedRaw);
+            record.x = data.delta.x;
+            record.y = data.delta.y;
+        } else if constexpr (std::is_same_v<T, sf::Event::MouseEntered>) {
+            record.type = static_cast<std::int32_t>(EventType::MouseEntered);
+        } else if constexpr (std::is_same_v<T, sf::Event::MouseLeft>) {
+            record.type = static_cast<std::int32_t>(EventType::MouseLeft);
+        } else if constexpr (std::is_same_v<T, sf::Event::JoystickButtonPressed> || std::is_same_v<T, sf::Event::JoystickButtonReleased>) {
+            record.type = static_cast<std::int32_t>(
+                std::is_same_v<T, sf::Event::JoystickButtonPressed> ? EventType::JoystickButtonPressed : EventType::JoystickButtonReleased
+            );
+            record.code = static_cast<std::int32_t>(data.joystickId);
+            record.scancode = static_cast<std::int32_t>(data.button);
+        } else if constexpr (std::is_same_v<T, sf::Event::JoystickMoved>) {
+            record.type = static_cast<std::int32_t>(EventType::JoystickMoved);
+            record.code = static_cast<std::int32_t>(data.joystickId);
+            record.scancode = static_cast<std::int32_t>(data.axis);
+            record.value[0] = data.position;
+        } else if constexpr (std::is_same_v<T, sf::Event::JoystickConnected>) {
+            record.type = static_cast<std::int32_t>(EventType::JoystickConnected);
+            record.code = static_cast<std::int32_t>(data.joystickId);
+        } else if constexpr (std::is_same_v<T, sf::Event::JoystickDisconnected>) {
+            record.type = static_cast<std::int32_t>(EventType::JoystickDisconnected);
+            record.code = static_cast<std::int32_t>(data.joystickId);
+        } else if constexpr (std::is_same_v<T, sf::Event::TouchBegan> || std::is_same_v<T, sf::Event::TouchMoved> || std::is_same_v<T, sf::Event::TouchEnded>) {
+            if constexpr (std::is_same_v<T, sf::Event::TouchBegan>) {
+                record.type = static_cast<std::int32_t>(EventType::TouchBegan);
+            } else if constexpr (std::is_same_v<T, sf::Event::TouchMoved>) {
+                record.type = static_cast<std::int32_t>(EventType::TouchMoved);
+            } else {
+                record.type = static_cast<std::int32_t>(EventType::TouchEnded);
+            }
+            record.code = static_cast<std::int32_t>(data.finger);
+            record.x = data.position.x;
+            record.y = data.position.y;
+        } else if constexpr (std::is_same_v<T, sf::Event::SensorChanged>) {
+            record.type = static_cast<std::int32_t>(EventType::SensorChanged);
+            record.code = static_cast<std::int32_t>(data.type);
+            record.value[0] = data.value.x;
+            record.value[1] = data.value.y;
+            record.value[2] = data.value.z;
+        } else {
+            // A zeroed record would read as Closed, so a new event type must be added to EventType first.
+            static_assert(dependent_false<T>, "unhandled sf::Event subtype");
+        }
+    });
+    return record;
+}
+
+EventBuffer poll_events(sf::WindowBase& window, std::size_t maxEvents) {
+    EventBuffer buffer;
+    while (maxEvents == 0 || buffer.records.size() < maxEvents) {
+        const std::optional<sf::Event> event = window.pollEvent();
+        if (!event) {
+            break;
+        }
+        buffer.records.push_back(event_record(*event));
+    }
+    return buffer;
+}
+
+void bind_event_buffer(py::module& m, py::handle eventClass) {
+    py::enum_<EventType>(eventClass, "Type", "\\brief Type codes of the records of an `EventBuffer`")
+        .value("Closed", EventType::Closed)
+        .value("Resized", EventType::Resized)
+        .value("FocusLost", EventType::FocusLost)
+        .value("FocusGained", EventType::FocusGained)
+        .value("TextEntered", EventType::TextEntered)
+        .value("KeyPressed", EventType::KeyPressed)
+        .value("KeyReleased", EventType::KeyReleased)
+        .value("MouseWheelScrolled", EventType::MouseWheelScrolled)
+        .value("MouseButtonPressed", EventType::MouseButtonPressed)
+        .value("MouseButtonReleased", EventType::MouseButtonReleased)
+        .value("MouseMoved", EventType::MouseMoved)
+        .value("MouseMovedRaw", EventType::MouseMovedRaw)
+        .value("MouseEntered", EventType::MouseEntered)
+        .value("MouseLeft", EventType::MouseLeft)
+        .value("JoystickButtonPressed", EventType::JoystickButtonPressed)
+        .value("JoystickButtonReleased", EventType::JoystickButtonReleased)
+        .value("JoystickMoved", EventType::JoystickMoved)
+        .value("JoystickConnected", EventType::JoystickConnected)
+        .value("JoystickDisconnected", EventType::JoystickDisconnected)
+        .value("TouchBegan", EventType::TouchBegan)
+        .value("TouchMoved", EventType::TouchMoved)
+        .value("TouchEnded", EventType::TouchEnded)
+        .value("SensorChanged", EventType::SensorChanged);
+
+    auto v_EventBuffer = py::class_<EventBuffer>(m, "EventBuffer", "\\brief Events drained from a window in a single call\n\nEvery event is a fixed-size record with the fields `type` (an `Event.Type`\ncode), `code`, `scancode`, `modifiers`, `x`, `y` and `value` (3 floats):\n\n- Resized: `x`, `y` = new size\n- TextEntered: `code` = unicode code point\n- KeyPressed / KeyReleased: `code` = key, `scancode` = scancode,\n  `modifiers` = alt (1) | control (2) | shift (4) | system (8)\n- MouseWheelScrolled: `code` = wheel, `x`, `y` = position, `value[0]` = delta\n- MouseButtonPressed / MouseButtonReleased: `code` = button, `x`, `y` = position\n- MouseMoved: `x`, `y` = position; MouseMovedRaw: `x`, `y` = delta\n- Joystick events: `code` = joystick id, `scancode` = button or axis,\n  `value[0]` = axis position\n- Touch events: `code` = finger, `x`, `y` = position\n- SensorChanged: `code` = sensor type, `value` = sensor value\n\nThe buffer protocol exposes the records as a NumPy structured array (compare\nits `type` field with `Event.Type.X.value`), and indexing returns them as plain\ntuples in the field order above, starting with the `Event.Type`.", py::buffer_protocol());
+    v_EventBuffer.def_buffer([](EventBuffer& self) {
+        return py::buffer_info(
+            self.records.data(),
+            sizeof(EventRecord),
+            event_buffer_format(),
+            1,
+            { static_cast<py::ssize_t>(self.records.size()) },
+            { static_cast<py::ssize_t>(sizeof(EventRecord)) }
+        );
+    });
+    v_EventBuffer.def("__len__", [](EventBuffer& self) { return self.records.size(); });
+    v_EventBuffer.def("__getitem__", [](EventBuffer& self, py::ssize_t index) {
+        const py::ssize_t size = static_cast<py::ssize_t>(self.records.size());
+        if (index < 0) {
+            index += size;
+        }
+        if (index < 0 || index >= size) {
+            throw py::index_error("event buffer index out of range");
+        }
+        const EventRecord& record = self.records[static_cast<std::size_t>(index)];
+        return py::make_tuple(
+            static_cast<EventType>(record.type), record.code, record.scancode, record.modifiers, record.x, record.y, record.value[0], record.value[1], record.value[2]
+        );
+    }, py::arg("index"));
+}
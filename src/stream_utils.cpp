@@ -0,0 +1,62 @@
+#include "stream_utils.hpp"
+#include "buffer_utils.hpp"
+#include "SFML/System/MemoryInputStream.hpp"
+#include <algorithm>
+#include <cstring>
+
+namespace {
+std::size_t checked_range_size(std::size_t total, std::size_t offset, std::optional<std::size_t> length) {
+    if (offset > total) {
+        throw py::value_error("offset " + std::to_string(offset) + " is past the end of the " + std::to_string(total) + " bytes of data");
+    }
+    const std::size_t size = length.value_or(total - offset);
+    if (size > total - offset) {
+        throw py::value_error(
+            "range of " + std::to_string(size) + " bytes at offset " + std::to_string(offset) + " exceeds the " + std::to_string(total) + " bytes of data"
+        );
+    }
+    return size;
+}
+}
+
+MappedFileInputStream::MappedFileInputStream(const std::string& filename, std::size_t offset, std::optional<std::size_t> length)
+    : m_mapping(py::reinterpret_borrow<py::buffer>(load_mapped(filename)).request()) {
+    m_size = checked_range_size(static_cast<std::size_t>(m_mapping.size), offset, length);
+    m_data = static_cast<const std::uint8_t*>(m_mapping.ptr) + offset;
+}
+
+std::optional<std::size_t> MappedFileInputStream::read(void* data, std::size_t size) {
+    const std::size_t count = std::min(size, m_size - m_position);
+    if (count > 0) {
+        std::memcpy(data, m_data + m_position, count);
+        m_position += count;
+    }
+    return count;
+}
+
+std::optional<std::size_t> MappedFileInputStream::seek(std::size_t position) {
+    m_position = std::min(position, m_size);
+    return m_position;
+}
+
+std::optional<std::size_t> MappedFileInputStream::tell() {
+    return m_position;
+}
+
+std::optional<std::size_t> MappedFileInputStream::getSize() {
+    return m_size;
+}
+
+sf::MemoryInputStream memory_input_stream_from_buffer(const py::buffer& data, std::size_t offset, std::optional<std::size_t> length) {
+    py::buffer_info info = data.request();
+    require_c_contiguous(info, "data");
+
+    const std::size_t bytes = static_cast<std::size_t>(info.size) * static_cast<std::size_t>(info.itemsize);
+    const std::size_t size = checked_range_size(bytes, offset, length);
+    return sf::MemoryInputStream(static_cast<const std::uint8_t*>(info.ptr) + offset, size);
+}
+
+void bind_mapped_file_input_stream(py::module& m) {
+    auto v_MappedFileInputStream = py::class_<MappedFileInputStream, sf::InputStream>(m, "MappedFileInputStream", "\\brief Input stream reading from a memory-mapped file\n\nThe stream is implemented natively, so decoders reading from it (`Music`,\n`Font`, ...) never call into Python, and the file pages are loaded by the\noperating system as they are read. A sub-range of the file can be selected to\nstream an entry of a packed archive.");
+    v_MappedFileInputStream.def(py::init<const std::string&, std::size_t, std::optional<std::size_t>>(), "\\brief Map a file, or a range of it\n\n\\param filename Path of the file to map\n\n\\param offset   Position of the first byte of the range in the file\n\n\\param length   Number of bytes of the range, up to the end of the file by default", py::arg("filename"), py::arg("offset") = 0, py::arg("length") = py::none());
+}
@@ -1,4 +1,9 @@
 #include "utils.hpp"
+#include <algorithm>
+#include <atomic>
+#include <exception>
+#include <mutex>
+#include <thread>
 #include <type_traits>
 
 namespace {
@@ -45,3 +50,72 @@ std::uintptr_t WindowHandle::toInteger() const {
 WindowHandle::operator sf::WindowHandle() const {
     return nativeHandle;
 }
+
+void parallel_for(std::size_t count, unsigned int workers, const std::function<void(std::size_t)>& task) {
+    if (workers == 0) {
+        workers = std::max(1u, std::thread::hardware_concurrency());
+    }
+    const std::size_t threadCount = std::min<std::size_t>(workers, count);
+    if (threadCount <= 1) {
+        for (std::size_t i = 0; i < count; ++i) {
+            task(i);
+        }
+        return;
+    }
+
+    std::atomic<std::size_t> next{0};
+    std::exception_ptr error;
+    std::mutex errorMutex;
+    const auto work = [&]() {
+        for (std::size_t i = next++; i < count; i = next++) {
+            try {
+                task(i);
+            } catch (...) {
+                std::lock_guard<std::mutex> lock(errorMutex);
+                if (!error) {
+                    error = std::current_exception();
+                }
+            }
+        }
+    };
+
+    std::vector<std::thread> threads;
+    threads.reserve(threadCount - 1);
+    for (std::size_t i = 1; i < threadCount; ++i) {
+        threads.emplace_back(work);
+    }
+    work();
+    for (std::thread& thread : threads) {
+        thread.join();
+    }
+    if (error) {
+        std::rethrow_exception(error);
+    }
+}
+
+void replace_keep_alive_impl(py::handle nurse, py::handle patient) {
+    if (!nurse || !patient) {
+        py::pybind11_fail("Could not activate replace_keep_alive!");
+    }
+    if (nurse.is_none()) {
+        return;
+    }
+
+    // Never destroyed, so no Python object is released after the interpreter is finalized.
+    static py::dict& patients = *new py::dict();
+    const py::int_ key(reinterpret_cast<std::uintptr_t>(nurse.ptr()));
+    if (patient.is_none()) {
+        // e.g. setTexture(None), the previous source is no longer used.
+        patients.attr("pop")(key, py::none());
+        return;
+    }
+    if (!patients.contains(key)) {
+        // The entry is dropped once the nurse is destroyed, after its C++ object.
+        py::cpp_function release([key](py::handle weakref) {
+            patients.attr("pop")(key, py::none());
+            weakref.dec_ref();
+        });
+        py::weakref(nurse, release).release();
+    }
+    patients[key] = patient;
+}